@@ -1,3 +1,10 @@
 from .api import OmniAPI
 
 __all__ = ['OmniAPI']
+
+try:
+    from .async_api import AsyncOmniAPI
+    __all__.append('AsyncOmniAPI')
+except ImportError:
+    # httpx is optional, only needed for the asyncio client
+    pass
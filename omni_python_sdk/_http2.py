@@ -0,0 +1,133 @@
+from ._lines import STREAM_CHUNK_SIZE, iter_lines
+
+try:
+    import httpx
+    import h2  # noqa: F401 -- required by httpx for http2=True
+    from ._retry import RetryTransport
+except ImportError:
+    httpx = None
+
+HTTP2_AVAILABLE = httpx is not None
+
+class HTTPXResponse:
+    """
+    Wraps an `httpx.Response` with the parts of the `requests.Response` API
+    used by the SDK, so call sites work the same on either backend. Anything
+    else is looked up on the wrapped response, and `raise_for_status` raises
+    `httpx.HTTPStatusError` rather than `requests.HTTPError`.
+    Args:
+        response (httpx.Response): The response to wrap.
+    """
+    def __init__(self, response):
+        self._response = response
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._response.close()
+
+    def iter_content(self, chunk_size: int = None):
+        """
+        Iterate over the raw body in chunks, like `requests.Response.iter_content`.
+        Args:
+            chunk_size (int, optional): Size of the chunks to yield.
+        Yields:
+            bytes: The next chunk of the body.
+        """
+        return self._response.iter_bytes(chunk_size)
+
+    def iter_lines(self):
+        """
+        Iterate over the body one line at a time as `bytes`, like requests does,
+        rather than the decoded `str` lines httpx yields.
+        Yields:
+            bytes: Each non blank line of the body, without its line ending.
+        """
+        return iter_lines(self._response.iter_bytes(STREAM_CHUNK_SIZE))
+
+class HTTPXSession:
+    """
+    A thin `requests.Session` look-alike over an HTTP/2 `httpx.Client`, so
+    concurrent calls are multiplexed over a shared connection. It keeps the
+    behaviour of the requests backend: redirects are followed and idempotent
+    requests answered with a retryable status are retried with backoff, the
+    same policy as its `urllib3.Retry` (see `RetryTransport`). Transport
+    failures raise `httpx.HTTPError`.
+    Args:
+        headers (dict): Default headers sent with every request.
+        max_connections (int): Upper bound on open connections.
+    """
+    def __init__(self, headers: dict, max_connections: int = 20):
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._transport = httpx.HTTPTransport(http2=True, limits=limits)
+        self._client = httpx.Client(
+            headers=headers,
+            timeout=httpx.Timeout(60.0),
+            follow_redirects=True,
+            transport=RetryTransport(self._transport),
+        )
+
+    @property
+    def headers(self):
+        return self._client.headers
+
+    def request(self, method: str, url: str, params: dict = None, data: bytes = None, json=None, stream: bool = False, **kwargs) -> HTTPXResponse:
+        """
+        Send a request, accepting the same keyword arguments as `requests.Session.request`.
+        Args:
+            method (str): The HTTP method.
+            url (str): The endpoint URL.
+            params (dict, optional): Query parameters, None values are dropped as requests does.
+            data (bytes, optional): A pre-encoded request body.
+            json (optional): A body to JSON encode.
+            stream (bool, optional): Defer reading the body until it is iterated.
+            **kwargs: Passed through to `httpx.Client.build_request`.
+        Returns:
+            HTTPXResponse: The wrapped response.
+        """
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+        request = self._client.build_request(method, url, params=params, content=data, json=json, **kwargs)
+        return HTTPXResponse(self._client.send(request, stream=stream))
+
+    def probe(self, url: str, timeout: float) -> None:
+        """
+        Send a single HEAD, with no retries, so a connection is left open in the pool.
+        Args:
+            url (str): The URL to reach.
+            timeout (float): Seconds allowed for each of connecting and reading.
+        Raises:
+            httpx.HTTPError: If the request fails.
+        """
+        request = self._client.build_request('HEAD', url, timeout=timeout)
+        response = self._transport.handle_request(request)
+        try:
+            # reading to the end keeps the connection for reuse
+            response.read()
+        finally:
+            response.close()
+
+    def get(self, url: str, **kwargs) -> HTTPXResponse:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> HTTPXResponse:
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> HTTPXResponse:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> HTTPXResponse:
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> HTTPXResponse:
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> HTTPXResponse:
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self) -> None:
+        self._client.close()
@@ -0,0 +1,74 @@
+# bytes requested per read when streaming NDJSON bodies
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class LineBuffer:
+    """
+    Splits a chunked byte stream into lines in linear time. Each chunk is
+    appended to one growing buffer and only the newly arrived bytes are
+    searched for a newline, so a single multi-megabyte line (a base64 query
+    result) costs O(n) rather than re-splitting everything pending per chunk.
+    Example Use:
+        buffer = LineBuffer()
+        for chunk in chunks:
+            yield from buffer.feed(chunk)
+        yield from buffer.close()
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        Add a chunk to the buffer.
+        Args:
+            chunk (bytes): The next chunk of the body.
+        Returns:
+            list: The non blank lines completed by this chunk, without line endings.
+        """
+        start = len(self._buffer)
+        self._buffer += chunk
+        newline = self._buffer.find(b'\n', start)
+        if newline == -1:
+            return []
+        lines = []
+        pos = 0
+        while newline != -1:
+            line = self._line(pos, newline)
+            if line:
+                lines.append(line)
+            pos = newline + 1
+            newline = self._buffer.find(b'\n', pos)
+        del self._buffer[:pos]
+        return lines
+
+    def close(self) -> list:
+        """
+        Flush whatever follows the last newline.
+        Returns:
+            list: The trailing line, if it is not blank.
+        """
+        line = self._line(0, len(self._buffer))
+        self._buffer.clear()
+        return [line] if line else []
+
+    def _line(self, start: int, end: int) -> bytes:
+        if end > start and self._buffer[end - 1] == ord('\r'):
+            end -= 1
+        # slice through a view so the line is copied once, not once for the
+        # bytearray slice and again for bytes(); the view is released before
+        # the caller resizes the buffer
+        with memoryview(self._buffer) as view:
+            line = bytes(view[start:end])
+        return b'' if line.isspace() else line
+
+def iter_lines(chunks):
+    """
+    Iterate over the lines of a chunked byte stream, see `LineBuffer`.
+    Args:
+        chunks (Iterable[bytes]): The body chunks, e.g. `response.iter_content(STREAM_CHUNK_SIZE)`.
+    Yields:
+        bytes: Each non blank line, without its line ending.
+    """
+    buffer = LineBuffer()
+    for chunk in chunks:
+        yield from buffer.feed(chunk)
+    yield from buffer.close()
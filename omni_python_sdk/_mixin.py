@@ -0,0 +1,505 @@
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import orjson
+import base64
+import re
+from typing import List, Tuple, Any, Optional, Dict, Iterable
+import os
+from dotenv import load_dotenv
+
+class _QueryScan:
+    """
+    Picks result payloads out of a query NDJSON stream one line at a time,
+    keeping any I/O with the caller so both clients feed it the same way.
+    Example Use:
+        scan = _QueryScan(parse_record)
+        for line in lines:
+            scan.feed(line)
+        results, footer = scan.finish()
+    Args:
+        parse_record (callable): Decodes a result line, see `OmniAPIMixin._parse_record`.
+    """
+    def __init__(self, parse_record):
+        self._parse_record = parse_record
+        self.results = []
+        self._footer = None
+        self._last_line = None
+
+    def feed(self, line: bytes) -> Optional[dict]:
+        """
+        Take the next line of the stream.
+        Args:
+            line (bytes): A single NDJSON line.
+        Returns:
+            dict: The decoded record if the line carried a result payload, otherwise None.
+        """
+        # only result lines are decoded as they stream past, of everything else
+        # just the last line (the footer) is kept and parsed once at the end
+        if b'"result"' in line:
+            record = self._parse_record(line)
+            if 'result' in record:
+                self.results.append(record)
+                self._footer, self._last_line = record, None
+                return record
+        self._last_line = line
+        return None
+
+    def finish(self) -> Tuple[List[dict], dict]:
+        """
+        Returns:
+            Tuple[List[dict], dict]: The result payloads and the last (footer) record.
+        """
+        if self._last_line is not None:
+            self._footer = orjson.loads(self._last_line)
+            self._last_line = None
+        return self.results, self._footer
+
+class _PollBackoff:
+    """
+    Exponential delay between /query/wait polls, reset whenever another job
+    finishes, so a slow query doesn't turn into a request storm.
+    Args:
+        footer (dict): The footer of the /query/run response.
+        initial (float): The first delay, in seconds.
+        maximum (float): The delay is doubled up to this many seconds.
+    """
+    def __init__(self, footer: dict, initial: float, maximum: float):
+        self._initial = initial
+        self._maximum = maximum
+        self._delay = initial
+        self._remaining = len(footer.get('remaining_job_ids', []))
+
+    @staticmethod
+    def done(footer: dict) -> bool:
+        return footer['timed_out'] == 'false'
+
+    def next_delay(self, footer: dict) -> Optional[float]:
+        """
+        Take the footer of the latest poll.
+        Args:
+            footer (dict): The footer of the /query/wait response.
+        Returns:
+            float: How long to sleep before polling again, None once the jobs are done.
+        """
+        if self.done(footer):
+            return None
+        remaining = len(footer.get('remaining_job_ids', []))
+        if remaining < self._remaining:
+            self._remaining = remaining
+            self._delay = self._initial
+        delay = self._delay
+        self._delay = min(delay * 2, self._maximum)
+        return delay
+
+class OmniAPIMixin:
+    """
+    Configuration, URL building, payload encoding and the I/O free query and
+    user bookkeeping shared by `OmniAPI` and `AsyncOmniAPI`; it holds no
+    transport of its own, each client only adds the requests and waits.
+    """
+    # seconds between /query/wait polls, doubling up to the max
+    POLL_INITIAL_DELAY = 0.1
+    POLL_MAX_DELAY = 2.0
+    # how long the server may hold a /query/wait request open
+    POLL_TIMEOUT_MS = 30000
+    # emails per SCIM filter request
+    USER_LOOKUP_CHUNK_SIZE = 50
+    # concurrent requests used by the batch helpers (create_fields, ...) and user lookups
+    BATCH_WORKERS = 16
+    # start of the base64 Arrow value in a query result line
+    _RESULT_VALUE = re.compile(rb'"result"\s*:\s*"')
+
+    def _configure(self, api_key: str, base_url: str, env_file: str) -> None:
+        '''
+        Resolves the api key and base url, from the env file when present,
+        and precomputes the default headers and endpoint prefixes
+        '''
+        if load_dotenv(dotenv_path=env_file):
+            if os.getenv('OMNI_API_KEY'):
+                self.api_key = os.getenv('OMNI_API_KEY')
+            else:
+                self.api_key = api_key
+            if os.getenv('OMNI_BASE_URL'):
+                self.base_url = os.getenv('OMNI_BASE_URL')
+            else: 
+                self.base_url = base_url
+        self._trim_base_url()
+        # endpoint prefixes are fixed per instance, build them once
+        self._docs_base = f"{self.base_url}/api/unstable"
+        self._model_base = f"{self._docs_base}/model"
+        self._scim_base = f"{self.base_url}/api/scim/v2/users"
+        self.headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+
+    def _trim_base_url(self) -> None:
+        '''
+        Trims the base_url to remove any trailing slashes or api versions
+        since the versioning of an endpoint is managed by the SDK methods,
+        and varies between endpoints
+        '''
+        if self.base_url.endswith('/'):
+            self.base_url = self.base_url[:-1]
+        if self.base_url.endswith('/api/v1'):
+            self.base_url = self.base_url[:-7]
+        if self.base_url.endswith('/api'):
+            self.base_url = self.base_url[:-4]
+        if self.base_url.endswith('/api/unstable'):
+            self.base_url = self.base_url[:-13]
+
+    @staticmethod
+    def _json(response: Any) -> Any:
+        """
+        Decode a JSON response body straight from its bytes with orjson.
+        Args:
+            response (requests.Response | httpx.Response): The response to decode.
+        Returns:
+            Any: The decoded JSON body.
+        """
+        return orjson.loads(response.content)
+
+    @staticmethod
+    def _dumps(body: dict) -> bytes:
+        """
+        Serialize a request body with orjson, which also handles numpy and
+        pandas scalars and non string keys without a cleaning pass.
+        Args:
+            body (dict): The request body.
+        Returns:
+            bytes: The encoded JSON body.
+        """
+        return orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    @classmethod
+    def _parse_record(cls, line: bytes) -> dict:
+        """
+        Decode one NDJSON record from a query response. For result payloads the
+        base64 Arrow data is left as a memoryview over the raw line rather than
+        copied into a `str`, which would double peak memory on large results.
+        Args:
+            line (bytes): A single NDJSON line.
+        Returns:
+            dict: The decoded record.
+        """
+        match = cls._RESULT_VALUE.search(line) if b'"result"' in line else None
+        if match is None:
+            return orjson.loads(line)
+        start = match.end()
+        # base64 has no quotes, so the value ends at the next one
+        end = line.index(b'"', start)
+        try:
+            record = orjson.loads(line[:match.start()] + b'"result":null' + line[end + 1:])
+        except orjson.JSONDecodeError:
+            # the match was a nested string holding escaped quotes, parse normally
+            return orjson.loads(line)
+        if record.get('result', False) is not None:
+            # the match was a nested key rather than the payload, parse normally
+            return orjson.loads(line)
+        record['result'] = memoryview(line)[start:end]
+        return record
+
+    @staticmethod
+    def _result_text(value: Any) -> str:
+        """
+        Turn a result value from `_parse_record` back into the decoded JSON string.
+        Args:
+            value (str | memoryview): The `result` value of a parsed record.
+        Returns:
+            str: The base64 payload with any JSON escapes (such as \\/) resolved.
+        """
+        if isinstance(value, str):
+            return value
+        # the view holds the raw JSON string contents, escapes and all
+        return orjson.loads(b'"' + bytes(value) + b'"')
+
+    @staticmethod
+    def _open_result(data_payload: dict) -> ipc.RecordBatchStreamReader:
+        """
+        Open the base64 Arrow IPC stream carried by a query result payload.
+        Args:
+            data_payload (dict): The NDJSON record holding the `result` key, as a
+                `str` or a bytes-like view over the raw line.
+        Returns:
+            ipc.RecordBatchStreamReader: A reader decoding the result batches on demand.
+        """
+        # b64decode takes the bytes view as is and skips JSON escapes such as \/
+        raw_arrow_data = base64.b64decode(data_payload['result'])
+        # Read Arrow batches straight from the decoded bytes, no BytesIO copy
+        return ipc.open_stream(pa.BufferReader(pa.py_buffer(raw_arrow_data)))
+
+    def _query_scan(self) -> _QueryScan:
+        """
+        Start scanning a query NDJSON stream, see `_QueryScan`.
+        """
+        return _QueryScan(self._parse_record)
+
+    def _poll_backoff(self, footer: dict) -> _PollBackoff:
+        """
+        Start the backoff between polls of a query, see `_PollBackoff`.
+        Args:
+            footer (dict): The footer of the /query/run response.
+        """
+        return _PollBackoff(footer, self.POLL_INITIAL_DELAY, self.POLL_MAX_DELAY)
+
+    @staticmethod
+    def _first_result(results: List[dict]) -> dict:
+        """
+        Pick the result payload out of the records of the final poll.
+        Raises:
+            ValueError: If no result is found in the response.
+        """
+        if results:
+            return results[0]
+        else:
+            raise ValueError("No result found in the response.")
+
+    @classmethod
+    def _wait_records(cls, results: List[dict], footer: dict) -> Tuple[List[dict], bool]:
+        """
+        Assemble the `wait_query_blocking` return value from a scanned response.
+        Args:
+            results (List[dict]): The result payloads, see `_QueryScan`.
+            footer (dict): The footer of the response.
+        Returns:
+            Tuple[List[dict], bool]: The records, footer last, and whether the jobs are done.
+        """
+        for record in results:
+            # hand callers the base64 payload as a str, like the rest of the JSON
+            record['result'] = cls._result_text(record['result'])
+        if not results or results[-1] is not footer:
+            results.append(footer)
+        return results, _PollBackoff.done(footer)
+
+    @classmethod
+    def _read_result(cls, data_payload: dict) -> Tuple[pa.Table, List[dict]]:
+        """
+        Decode a query result payload into a single table.
+        Args:
+            data_payload (dict): The NDJSON record holding the `result` key.
+        Returns:
+            Tuple[pa.Table, List[dict]]: A tuple containing the result table and field information.
+        """
+        table = cls._open_result(data_payload).read_all()
+        return table, data_payload['summary']['fields']
+
+    def _base_model_url(self) -> str:
+        """
+        Get the base URL for model operations.
+        Returns:
+            str: The base URL for model operations.
+        """
+        return self._model_base
+
+    def _model_url(self, model_id: str) -> str:
+        """
+        Get the URL for a specific model.
+        Args:
+            model_id (str): The ID of the model.
+        Returns:
+            str: The URL for the specified model.
+        """
+        return f"{self._model_base}/{model_id}"
+
+    def _base_topic_url(self, model_id: str) -> str:
+        """
+        Get the base URL for topic operations.
+        Args:
+            model_id (str): The ID of the model.
+        Returns:
+            str: The base URL for topic operations.
+        """
+        return f"{self._model_base}/{model_id}/topic"
+
+    def _topic_url(self, model_id: str, topic_name: str) -> str:
+        """
+        Get the URL for a specific topic.
+        Args:
+            model_id (str): The ID of the model.
+            topic_name (str): The name of the topic.
+        Returns:
+            str: The URL for the specified topic.
+        """
+        return f"{self._model_base}/{model_id}/topic/{topic_name}"
+
+    def _base_view_url(self, model_id: str) -> str:
+        """
+        Get the base URL for view operations.
+        Args:
+            model_id (str): The ID of the model.
+        Returns:
+            str: The base URL for view operations.
+        """
+        return f"{self._model_base}/{model_id}/view"
+
+    def _view_url(self, model_id: str, view_name: str) -> str:
+        """
+        Get the URL for a specific view.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view.
+        Returns:
+            str: The URL for the specified view.
+        """
+        return f"{self._model_base}/{model_id}/view/{view_name}"
+
+    def _base_field_url(self, model_id: str) -> str:
+        """
+        Get the base URL for field operations.
+        Args:
+            model_id (str): The ID of the model.
+        Returns:
+            str: The base URL for field operations.
+        """
+        return f"{self._model_base}/{model_id}/view/field"
+
+    def _field_url(self, model_id: str, view_name: str, field_name: str) -> str:
+        """
+        Get the URL for a specific field.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view.
+            field_name (str): The name of the field.
+        Returns:
+            str: The URL for the specified field.
+        """
+        return f"{self._model_base}/{model_id}/view/{view_name}/field/{field_name}"
+    
+    def _user_chunks(self, emails: List[str]) -> List[List[str]]:
+        """
+        Split emails into the batches looked up by one SCIM filter request each.
+        SCIM userName comparisons are case insensitive, so each address is only
+        looked up once however many spellings of it are passed.
+        """
+        unique = list({email.lower(): email for email in emails}.values())
+        size = self.USER_LOOKUP_CHUNK_SIZE
+        return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+    @staticmethod
+    def _user_filter(emails: List[str]) -> str:
+        """
+        Build the SCIM filter matching any of the emails.
+        """
+        return ' or '.join(f'userName eq "{email}"' for email in emails)
+
+    @staticmethod
+    def _next_user_page(collected: int, page: dict) -> Optional[int]:
+        """
+        Work out where the next page of a chunked SCIM lookup starts. The server
+        may return fewer resources than the `count` asked for, so paging goes on
+        until `totalResults` have been collected.
+        Args:
+            collected (int): How many resources the lookup has received so far.
+            page (dict): The SCIM list response just received.
+        Returns:
+            int: The 1-based `startIndex` of the next page, None once the lookup is complete.
+        """
+        if not page.get('Resources') or collected >= page.get('totalResults', 0):
+            return None
+        return collected + 1
+
+    @staticmethod
+    def _merge_user_lookups(emails: List[str], lookups: Iterable[List[dict]]) -> Dict[str, List[dict]]:
+        """
+        Group the user resources returned by the chunked lookups by email.
+        Args:
+            emails (List[str]): The emails that were looked up.
+            lookups (Iterable[List[dict]]): The SCIM user resources of each lookup.
+        Returns:
+            Dict[str, List[dict]]: The matching user resources for each email, an empty list if none were found.
+        """
+        by_username = {email.lower(): [] for email in emails}
+        for resources in lookups:
+            for user in resources:
+                matched = by_username.get(user['userName'].lower())
+                if matched is not None:
+                    matched.append(user)
+        # every spelling of an address shares the users found for it
+        return {email: by_username[email.lower()] for email in emails}
+
+    @staticmethod
+    def _dedupe_user_rows(users: List[dict]) -> List[dict]:
+        """
+        Collapse upsert rows that name the same user, the last row winning, so
+        a repeated or case variant email is not created or updated twice
+        against the same lookup.
+        Args:
+            users (List[dict]): The rows passed to `upsert_users`.
+        Returns:
+            List[dict]: One row per user, in order of each user's first row.
+        Prints:
+            A note for each email given more than once.
+        """
+        rows = {}
+        for user in users:
+            key = user['email'].lower()
+            if key in rows:
+                print(f"{user['email']} given more than once, using its last row")
+            rows[key] = user
+        return list(rows.values())
+
+    def _plan_upsert(self, email: str, displayName: str, attributes: dict, users: List[dict]) -> Tuple[str, dict]:
+        """
+        Decide how to upsert a user given the users already found for its email.
+        Args:
+            email (str): The email address of the user.
+            displayName (str): The display name for the user.
+            attributes (dict): Additional attributes for the user.
+            users (List[dict]): The existing users matching the email.
+        Returns:
+            Tuple[str, dict]: The action, one of 'update', 'create' or 'skip', and the request body.
+        """
+        body ={
+            "urn:omni:params:1.0:UserAttribute":self.listify(attributes),
+            "userName":email,
+            "displayName":displayName,
+        }
+        if len(users) == 1:
+            return 'update', body
+        elif len(users) == 0:
+            return 'create', body
+        return 'skip', body
+
+    def _report_upsert(self, action: str, email: str, users: List[dict], response: Any) -> None:
+        """
+        Print the outcome of an upsert planned by `_plan_upsert`.
+        Args:
+            action (str): The planned action.
+            email (str): The email address of the user.
+            users (List[dict]): The existing users matching the email.
+            response (requests.Response | httpx.Response): The response of the call, None if it failed or was skipped.
+        """
+        if action == 'update':
+            user = users[0]
+            if response is not None and response.status_code == 200:
+                print(f"updated user id {user['id']}")
+            else:
+                print(f"Error updating user id {user['id']}")
+        elif action == 'create':
+            if response is not None and response.status_code == 201:
+                print(f'Created {email}, userid: {self._json(response)["id"]}')
+            else:
+                print(f'Error creating {email}')
+        else:
+            print(f'{len(users)} found for {email}, no action taken')
+
+    @classmethod
+    def listify(cls, d:dict) -> dict:
+        """
+        Convert string representations of lists in a dictionary to actual lists.
+        Only string values wrapped in brackets, e.g. "[north,south]", are converted;
+        everything else, including non string values, is passed through unchanged.
+        Args:
+            d (dict): The input dictionary.
+        Returns:
+            dict: A new dictionary with string representations of lists converted to actual lists.
+        """
+        out = {}
+        for k,v in d.items():
+            # only the first and last characters need checking, not a scan of v
+            if isinstance(v, str) and v.startswith('[') and v.endswith(']'):
+                inner = v[1:-1]
+                out[k] = [item.strip() for item in inner.split(',')] if inner else []
+            else:
+                out[k] = v
+        return out
@@ -0,0 +1,88 @@
+import asyncio
+import time
+import httpx
+
+# mirrors the requests backend's Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504])
+RETRIES = 3
+BACKOFF_FACTOR = 0.2
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+# urllib3 only retries on a status for methods that are safe to repeat
+RETRY_METHODS = frozenset(['DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT', 'TRACE'])
+# failures before anything was sent, retried for every method like urllib3 does
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+def retry_delay(attempt: int, response: httpx.Response = None) -> float:
+    """
+    How long to wait before retrying, honouring a Retry-After header in
+    seconds and otherwise backing off like urllib3: no wait before the first
+    retry, then `BACKOFF_FACTOR * 2 ** attempt`.
+    Args:
+        attempt (int): How many retries have already been made.
+        response (httpx.Response, optional): The response that is being retried,
+            None when the connection failed.
+    Returns:
+        float: The delay in seconds.
+    """
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after is not None and retry_after.strip().isdigit():
+        return float(retry_after)
+    return BACKOFF_FACTOR * 2 ** attempt if attempt else 0.0
+
+def _retry_status(request: httpx.Request, response: httpx.Response) -> bool:
+    return request.method in RETRY_METHODS and response.status_code in RETRY_STATUSES
+
+class RetryTransport(httpx.BaseTransport):
+    """
+    Retries failed connections, and idempotent requests answered with a
+    retryable status, the same policy the requests backend gets from
+    `urllib3.Retry`: at most `RETRIES` retries in total. The wrapped
+    transport should be built with no retries of its own.
+    Args:
+        transport (httpx.BaseTransport): The transport sending the requests.
+    """
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(RETRIES + 1):
+            try:
+                response = self._transport.handle_request(request)
+            except RETRY_ERRORS:
+                if attempt == RETRIES:
+                    raise
+                time.sleep(retry_delay(attempt))
+                continue
+            if attempt == RETRIES or not _retry_status(request, response):
+                return response
+            response.close()
+            time.sleep(retry_delay(attempt, response))
+
+    def close(self) -> None:
+        self._transport.close()
+
+class AsyncRetryTransport(httpx.AsyncBaseTransport):
+    """
+    asyncio version of `RetryTransport`, waiting out the backoff without
+    blocking the event loop.
+    Args:
+        transport (httpx.AsyncBaseTransport): The transport sending the requests.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(RETRIES + 1):
+            try:
+                response = await self._transport.handle_async_request(request)
+            except RETRY_ERRORS:
+                if attempt == RETRIES:
+                    raise
+                await asyncio.sleep(retry_delay(attempt))
+                continue
+            if attempt == RETRIES or not _retry_status(request, response):
+                return response
+            await response.aclose()
+            await asyncio.sleep(retry_delay(attempt, response))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
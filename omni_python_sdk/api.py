@@ -1,15 +1,15 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pyarrow as pa
-import pyarrow.ipc as ipc
-import io
-import urllib.parse
-import json
-import ndjson
-import base64
-from typing import List, Tuple, Any, Union
-import os
-from dotenv import load_dotenv
+import orjson
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Any, Union, Optional, Dict, Iterator
 import functools
+from ._http2 import HTTP2_AVAILABLE, HTTPXSession
+from ._mixin import OmniAPIMixin
+from ._lines import STREAM_CHUNK_SIZE, iter_lines
 
 def requests_error_handler(func):
     """
@@ -38,186 +38,224 @@ def requests_error_handler(func):
             return None
     return wrapper
 
-class OmniAPI:
-    def __init__(self, api_key: str = '', base_url: str = "https://dev.thundersalmon.com",env_file: str = '.env'):
-        if load_dotenv(dotenv_path=env_file):
-            if os.getenv('OMNI_API_KEY'):
-                self.api_key = os.getenv('OMNI_API_KEY')
-            else:
-                self.api_key = api_key
-            if os.getenv('OMNI_BASE_URL'):
-                self.base_url = os.getenv('OMNI_BASE_URL')
-            else: 
-                self.base_url = base_url
-        self._trim_base_url()
-        self.headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-
-    def _trim_base_url(self) -> None:
-        '''
-        Trims the base_url to remove any trailing slashes or api versions
-        since the versioning of an endpoint is managed by the SDK methods,
-        and varies between endpoints
-        '''
-        if self.base_url.endswith('/'):
-            self.base_url = self.base_url[:-1]
-        if self.base_url.endswith('/api/v1'):
-            self.base_url = self.base_url[:-7]
-        if self.base_url.endswith('/api'):
-            self.base_url = self.base_url[:-4]
-        if self.base_url.endswith('/api/unstable'):
-            self.base_url = self.base_url[:-13]
-            
-    @requests_error_handler
-    def wait_query_blocking(self, remaining_job_ids: List[str]) -> Tuple[Any, bool]:
+class OmniAPI(OmniAPIMixin):
+    # seconds the optional warm-up probe may take to connect, and again to read
+    WARM_UP_TIMEOUT = 5
+    def __init__(self, api_key: str = '', base_url: str = "https://dev.thundersalmon.com",env_file: str = '.env', http2: bool = False, warm_up: bool = False):
+        self._configure(api_key, base_url, env_file)
+        self.session = self._build_session(http2)
+        # one pool for the batch helpers and user lookups, shut down by close()
+        self._executor = ThreadPoolExecutor(max_workers=self.BATCH_WORKERS)
+        if warm_up:
+            self._warm_up()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self) -> None:
         """
-        Wait for query jobs to complete.
-        Args:
-            remaining_job_ids (List[str]): List of job IDs to wait for.
-        Returns:
-            Tuple[Any, bool]: A tuple containing the response JSON and a boolean indicating if the jobs are done.
-        Raises:
-            requests.exceptions.RequestException: If the API request fails.
+        Shut down the batch thread pool and close the session's pooled connections.
         """
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def _warm_up(self) -> None:
         '''
-        remaining_job_ids: List[str] - the list of job ids to wait for
-        Wait for a query to complete by providing a list of job ids.
+        Sends a cheap HEAD to the base url so DNS, TCP and TLS are done and a
+        connection is waiting in the pool before the first real call; useful for
+        short lived scripts where that setup dominates. It is a single attempt
+        that skips the session's retries, so an unreachable host delays __init__
+        by at most WARM_UP_TIMEOUT seconds to connect plus as long again to read
+        (and DNS resolution, which is not covered by the timeout). Failures are
+        ignored, the first real request will simply open its own connection
         '''
-        url = f"{self.base_url}/api/unstable/query/wait"
-        
-        # URL encode the query parameter
-        encoded_query = urllib.parse.urlencode({'job_ids': json.dumps(remaining_job_ids)})
-        response = requests.get(f"{url}?{encoded_query}", headers=self.headers)
-        
-        if response.status_code == 200:
-            # Parse NDJSON response
-            response_json = ndjson.loads(response.text)
-            footer = response_json[-1]
-            done = footer['timed_out'] == 'false'
-            return response_json, done
-        else:
-            response.raise_for_status()
-
-    @requests_error_handler
-    def run_query_blocking(self, body: dict) -> Tuple[pa.Table, List[dict]]:
-        """
-        Run a query and wait for its completion.
+        try:
+            if isinstance(self.session, HTTPXSession):
+                self.session.probe(self.base_url, self.WARM_UP_TIMEOUT)
+                return
+            # a no-retry adapter over the same pool manager, so the connection it
+            # opens is the one the session's adapter picks up afterwards
+            adapter = self.session.get_adapter(self.base_url)
+            probe = HTTPAdapter(max_retries=0)
+            probe.poolmanager = adapter.poolmanager
+            request = self.session.prepare_request(requests.Request('HEAD', self.base_url))
+            # the same verify/proxy settings session.request would use, which are also part of the pool key
+            settings = self.session.merge_environment_settings(request.url, {}, None, None, None)
+            with probe.send(request, timeout=self.WARM_UP_TIMEOUT, **settings) as response:
+                # reading the (empty) body hands the connection back to the pool
+                # instead of closing it, as Session.send would have done
+                response.content
+        except Exception:
+            pass
+
+    def _build_session(self, http2: bool = False) -> requests.Session:
+        '''
+        Builds a session carrying the default headers. By default a requests.Session
+        with a pooled HTTPAdapter keeps connections alive and reuses them between
+        calls instead of paying a new TCP+TLS handshake per request. When http2 is
+        opted into and httpx with h2 is installed, an HTTP/2 client multiplexes every
+        call over a shared connection instead; methods documented as returning a
+        requests.Response then return an HTTPXResponse wrapping an httpx.Response,
+        and failed requests raise httpx.HTTPError rather than requests exceptions
+        '''
+        if http2 and HTTP2_AVAILABLE:
+            return HTTPXSession(self.headers, max_connections=self.BATCH_WORKERS + 4)
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            # enough connections that a full batch executor never waits on the pool
+            pool_maxsize=2 * self.BATCH_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504]),
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _post_json(self, url: str, body: dict, **kwargs) -> requests.Response:
+        """
+        Send a POST with an orjson encoded body; the session already carries
+        the `Content-Type: application/json` header.
         Args:
-            body (dict): The query body.
+            url (str): The endpoint URL.
+            body (dict): The request body.
+            **kwargs: Passed through to the session call.
         Returns:
-            Tuple[pa.Table, List[dict]]: A tuple containing the result table and field information.
-        Raises:
-            ValueError: If no result is found in the response.
-            requests.exceptions.RequestException: If the API request fails.
+            requests.Response: The response from the request.
         """
-        url = f"{self.base_url}/api/unstable/query/run"
-        response = requests.post(url, headers=self.headers, json=body)
-    
-        if response.status_code == 200:
-            # Parse NDJSON response
-            response_json = ndjson.loads(response.text)
-            footer = response_json[-1]
-            done = footer['timed_out'] == 'false'
-            while not done:
-                response_json, done = self.wait_query_blocking(footer['remaining_job_ids'])
-            data_payload = next((data_payload for data_payload in response_json if "result" in data_payload), None)
-            if data_payload is not None:
-                base64_data = data_payload['result']
-                raw_arrow_data = base64.b64decode(base64_data)
-                # Read Arrow table from raw data
-                buffer = io.BytesIO(raw_arrow_data)
-                reader = ipc.open_stream(buffer)
-                table = reader.read_all()
-                return table, data_payload['summary']['fields']
-            else:
-                raise ValueError("No result found in the response.")
-        else:
-            response.raise_for_status()
+        return self.session.post(url, data=self._dumps(body), **kwargs)
 
-    def _base_model_url(self) -> str:
+    def _patch_json(self, url: str, body: dict, **kwargs) -> requests.Response:
         """
-        Get the base URL for model operations.
-        Returns:
-            str: The base URL for model operations.
+        Send a PATCH with an orjson encoded body, see `_post_json`.
         """
-        return f"{self.base_url}/api/unstable/model"
+        return self.session.patch(url, data=self._dumps(body), **kwargs)
 
-    def _model_url(self, model_id: str) -> str:
+    def _put_json(self, url: str, body: dict, **kwargs) -> requests.Response:
         """
-        Get the URL for a specific model.
-        Args:
-            model_id (str): The ID of the model.
-        Returns:
-            str: The URL for the specified model.
+        Send a PUT with an orjson encoded body, see `_post_json`.
         """
-        return f"{self._base_model_url()}/{model_id}"
+        return self.session.put(url, data=self._dumps(body), **kwargs)
 
-    def _base_topic_url(self, model_id: str) -> str:
+    def _scan_query_response(self, response: requests.Response) -> Tuple[List[dict], dict]:
         """
-        Get the base URL for topic operations.
+        Read a query NDJSON stream, picking out result payloads while parsing.
         Args:
-            model_id (str): The ID of the model.
+            response (requests.Response): A response opened with `stream=True`.
         Returns:
-            str: The base URL for topic operations.
+            Tuple[List[dict], dict]: The result payloads and the last (footer) record.
         """
-        return f"{self._model_url(model_id)}/topic"
+        scan = self._query_scan()
+        for line in iter_lines(response.iter_content(STREAM_CHUNK_SIZE)):
+            scan.feed(line)
+        return scan.finish()
 
-    def _topic_url(self, model_id: str, topic_name: str) -> str:
+    def _wait_query(self, remaining_job_ids: List[str], timeout_ms: Optional[int] = None) -> Tuple[List[dict], dict]:
         """
-        Get the URL for a specific topic.
+        Poll the query wait endpoint once.
         Args:
-            model_id (str): The ID of the model.
-            topic_name (str): The name of the topic.
+            remaining_job_ids (List[str]): List of job IDs to wait for.
+            timeout_ms (int, optional): How long the server should hold the request open.
         Returns:
-            str: The URL for the specified topic.
+            Tuple[List[dict], dict]: The result payloads and the footer of the response.
+        Raises:
+            requests.exceptions.RequestException: If the API request fails.
         """
-        return f"{self._base_topic_url(model_id)}/{topic_name}"
+        url = f"{self._docs_base}/query/wait"
+        # the endpoint expects job_ids as a JSON encoded list
+        params = {'job_ids': orjson.dumps(remaining_job_ids).decode()}
+        if timeout_ms is not None:
+            params['timeout_ms'] = timeout_ms
+        with self.session.get(url, params=params, stream=True) as response:
+            response.raise_for_status()
+            return self._scan_query_response(response)
 
-    def _base_view_url(self, model_id: str) -> str:
+    @requests_error_handler
+    def wait_query_blocking(self, remaining_job_ids: List[str], timeout_ms: Optional[int] = None) -> Tuple[Any, bool]:
         """
-        Get the base URL for view operations.
+        Wait for query jobs to complete.
         Args:
-            model_id (str): The ID of the model.
+            remaining_job_ids (List[str]): List of job IDs to wait for.
+            timeout_ms (int, optional): How long the server should hold the request open
+                waiting for the jobs before answering with a timed out footer.
         Returns:
-            str: The base URL for view operations.
+            Tuple[Any, bool]: A tuple containing the response JSON and a boolean indicating if the jobs are done.
+        Raises:
+            requests.exceptions.RequestException: If the API request fails.
         """
-        return f"{self._base_model_url()}/{model_id}/view"
+        '''
+        remaining_job_ids: List[str] - the list of job ids to wait for
+        Wait for a query to complete by providing a list of job ids.
+        '''
+        results, footer = self._wait_query(remaining_job_ids, timeout_ms)
+        return self._wait_records(results, footer)
 
-    def _view_url(self, model_id: str, view_name: str) -> str:
+    def _run_query(self, body: dict) -> dict:
         """
-        Get the URL for a specific view.
+        Run a query, polling until it completes.
         Args:
-            model_id (str): The ID of the model.
-            view_name (str): The name of the view.
+            body (dict): The query body.
         Returns:
-            str: The URL for the specified view.
+            dict: The NDJSON record carrying the base64 Arrow result.
+        Raises:
+            ValueError: If no result is found in the response.
+            requests.exceptions.RequestException: If the API request fails.
         """
-        return f"{self._base_model_url(model_id)}/{view_name}"
+        url = f"{self._docs_base}/query/run"
+        with self._post_json(url, body, stream=True) as response:
+            response.raise_for_status()
+            scan = self._query_scan()
+            for line in iter_lines(response.iter_content(STREAM_CHUNK_SIZE)):
+                # a fast query can answer inline, no need to read on or poll
+                record = scan.feed(line)
+                if record is not None:
+                    return record
+        _, footer = scan.finish()
+        backoff = self._poll_backoff(footer)
+        results = []
+        while not backoff.done(footer):
+            results, footer = self._wait_query(footer['remaining_job_ids'], timeout_ms=self.POLL_TIMEOUT_MS)
+            delay = backoff.next_delay(footer)
+            if delay is None:
+                break
+            time.sleep(delay)
+        return self._first_result(results)
 
-    def _base_field_url(self, model_id: str) -> str:
+    @requests_error_handler
+    def run_query_blocking(self, body: dict) -> Tuple[pa.Table, List[dict]]:
         """
-        Get the base URL for field operations.
+        Run a query and wait for its completion.
         Args:
-            model_id (str): The ID of the model.
+            body (dict): The query body.
         Returns:
-            str: The base URL for field operations.
+            Tuple[pa.Table, List[dict]]: A tuple containing the result table and field information.
+        Raises:
+            ValueError: If no result is found in the response.
+            requests.exceptions.RequestException: If the API request fails.
         """
-        return f"{self._base_view_url(model_id)}/field"
+        return self._read_result(self._run_query(body))
 
-    def _field_url(self, model_id: str, view_name: str, field_name: str) -> str:
+    @requests_error_handler
+    def run_query_stream(self, body: dict) -> Tuple[Iterator[pa.RecordBatch], List[dict]]:
         """
-        Get the URL for a specific field.
+        Run a query and wait for its completion, returning the result as lazily
+        decoded record batches instead of one table, so callers that stop early
+        or hand batches on one at a time never materialize the whole result.
         Args:
-            model_id (str): The ID of the model.
-            view_name (str): The name of the view.
-            field_name (str): The name of the field.
+            body (dict): The query body.
         Returns:
-            str: The URL for the specified field.
+            Tuple[Iterator[pa.RecordBatch], List[dict]]: A tuple containing an iterator over the
+                result batches and field information.
+        Raises:
+            ValueError: If no result is found in the response.
+            requests.exceptions.RequestException: If the API request fails.
         """
-        return f"{self._view_url(model_id, view_name)}/field/{field_name}"
-    
+        data_payload = self._run_query(body)
+        return iter(self._open_result(data_payload)), data_payload['summary']['fields']
+
     @requests_error_handler
     def create_model(self, connection_id: str, body: dict) -> dict:
         """
@@ -232,9 +270,9 @@ class OmniAPI:
         """
         url = self._base_model_url()
         body["connectionId"] = connection_id
-        response = requests.post(url, headers=self.headers, json=body)
+        response = self._post_json(url, body)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def create_topic(self, model_id: str, base_view_name: str, body: dict) -> dict:
@@ -251,9 +289,9 @@ class OmniAPI:
         """
         url = self._base_topic_url(model_id)
         body["baseViewName"] = base_view_name
-        response = requests.post(url, headers=self.headers, json=body)
+        response = self._post_json(url, body)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def update_topic(self, model_id: str, topic_name: str, body: dict) -> dict:
@@ -269,9 +307,9 @@ class OmniAPI:
             requests.exceptions.RequestException: If the API request fails.
         """
         url = self._topic_url(model_id, topic_name)
-        response = requests.patch(url, headers=self.headers, json=body)
+        response = self._patch_json(url, body)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def delete_topic(self, model_id: str, topic_name: str) -> dict:
@@ -286,9 +324,9 @@ class OmniAPI:
             requests.exceptions.RequestException: If the API request fails.
         """
         url = self._topic_url(model_id, topic_name)
-        response = requests.delete(url, headers=self.headers)
+        response = self.session.delete(url)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def create_view(self, model_id: str, view_name: str, body: dict) -> dict:
@@ -305,9 +343,9 @@ class OmniAPI:
         """
         url = self._base_view_url(model_id)
         body["viewName"] = view_name
-        response = requests.post(url, headers=self.headers, json=body)
+        response = self._post_json(url, body)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def update_view(self, model_id: str, view_name: str, body: dict) -> dict:
@@ -324,9 +362,9 @@ class OmniAPI:
         """
         url = self._view_url(model_id, view_name)
         body["viewName"] = view_name
-        response = requests.patch(url, headers=self.headers, json=body)
+        response = self._patch_json(url, body)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def delete_view(self, model_id: str, view_name: str) -> dict:
@@ -341,9 +379,9 @@ class OmniAPI:
             requests.exceptions.RequestException: If the API request fails.
         """
         url = self._view_url(model_id, view_name)
-        response = requests.delete(url, headers=self.headers)
+        response = self.session.delete(url)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def create_field(self, model_id: str, view_name: str, field_name: str, body: dict) -> dict:
@@ -362,9 +400,9 @@ class OmniAPI:
         url = self._base_field_url(model_id)
         body["fieldName"] = field_name
         body["viewName"] = view_name
-        response = requests.post(url, headers=self.headers, json=body)
+        response = self._post_json(url, body)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def update_field(self, model_id: str, view_name: str, field_name: str, body: dict) -> dict:
@@ -381,9 +419,9 @@ class OmniAPI:
             requests.exceptions.RequestException: If the API request fails.
         """
         url = self._field_url(model_id, view_name, field_name)
-        response = requests.patch(url, headers=self.headers, json=body)
+        response = self._patch_json(url, body)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
     
     @requests_error_handler
     def delete_field(self, model_id: str, view_name: str, field_name: str) -> dict:
@@ -399,9 +437,64 @@ class OmniAPI:
             requests.exceptions.RequestException: If the API request fails.
         """
         url = self._field_url(model_id, view_name, field_name)
-        response = requests.delete(url, headers=self.headers)
+        response = self.session.delete(url)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
+
+    def _batch(self, func, *iterables) -> list:
+        """
+        Run independent API calls concurrently over the shared session.
+        Args:
+            func (callable): The API method to call.
+            *iterables: Argument iterables, zipped the same way as `map`.
+        Returns:
+            list: The results of each call, in input order.
+        """
+        return list(self._executor.map(func, *iterables))
+
+    def create_fields(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Create many fields concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per field with `view`, `field` and `body` keys.
+        Returns:
+            List[dict]: The created field information for each spec, None where a call failed.
+        """
+        return self._batch(lambda spec: self.create_field(model_id, spec['view'], spec['field'], spec['body']), specs)
+
+    def update_fields(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Update many fields concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per field with `view`, `field` and `body` keys.
+        Returns:
+            List[dict]: The updated field information for each spec, None where a call failed.
+        """
+        return self._batch(lambda spec: self.update_field(model_id, spec['view'], spec['field'], spec['body']), specs)
+
+    def delete_fields(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Delete many fields concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per field with `view` and `field` keys.
+        Returns:
+            List[dict]: The response of each delete operation, None where a call failed.
+        """
+        return self._batch(lambda spec: self.delete_field(model_id, spec['view'], spec['field']), specs)
+
+    def create_views(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Create many views concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per view with `view` and `body` keys.
+        Returns:
+            List[dict]: The created view information for each spec, None where a call failed.
+        """
+        return self._batch(lambda spec: self.create_view(model_id, spec['view'], spec['body']), specs)
 
     @requests_error_handler
     def create_user(self, body: dict) -> requests.Response:
@@ -414,8 +507,8 @@ class OmniAPI:
         Raises:
             requests.exceptions.RequestException: If the API request fails.
         """
-        url = f"{self.base_url}/api/scim/v2/users"
-        response = requests.post(url, headers=self.headers, json=body)
+        url = self._scim_base
+        response = self._post_json(url, body)
         response.raise_for_status()
         return response
 
@@ -431,8 +524,8 @@ class OmniAPI:
         Raises:
             requests.exceptions.RequestException: If the API request fails.
         """
-        url = f"{self.base_url}/api/scim/v2/users/{id}"
-        response = requests.put(url, headers=self.headers, json=body)
+        url = f"{self._scim_base}/{id}"
+        response = self._put_json(url, body)
         response.raise_for_status()
         return response
 
@@ -447,11 +540,101 @@ class OmniAPI:
         Raises:
             requests.exceptions.RequestException: If the API request fails.
         """
-        url = f"{self.base_url}/api/scim/v2/users"
-        response = requests.get(url, headers=self.headers, params={'filter': f'userName eq "{email}"'})
+        url = self._scim_base
+        response = self.session.get(url, params={'filter': f'userName eq "{email}"'})
         response.raise_for_status()
         return response
     
+    def _find_user_parsed(self, email: str) -> Tuple[Optional[requests.Response], Optional[dict]]:
+        """
+        Find a user by email and parse the SCIM response body once.
+        Args:
+            email (str): The email of the user to find.
+        Returns:
+            Tuple[requests.Response, dict]: The response and its parsed body, both None if the lookup failed.
+        """
+        response = self.find_user_by_email(email)
+        if response is None:
+            return None, None
+        return response, self._json(response)
+
+    def _find_users_chunk(self, emails: List[str]) -> List[dict]:
+        """
+        Look up a batch of users with a single SCIM filter, following further
+        pages when the server caps the page size below the batch size.
+        Args:
+            emails (List[str]): The emails of the users to find.
+        Returns:
+            List[dict]: The SCIM user resources matching any of the emails.
+        Raises:
+            requests.exceptions.RequestException: If the API request fails.
+        """
+        url = self._scim_base
+        params = {'filter': self._user_filter(emails), 'count': len(emails), 'startIndex': 1}
+        resources = []
+        while True:
+            response = self.session.get(url, params=params)
+            response.raise_for_status()
+            page = self._json(response)
+            resources.extend(page.get('Resources', []))
+            start = self._next_user_page(len(resources), page)
+            if start is None:
+                return resources
+            params['startIndex'] = start
+
+    @requests_error_handler
+    def find_users_by_emails(self, emails: List[str]) -> Dict[str, List[dict]]:
+        """
+        Find many users by email, batching the lookups into chunked SCIM filter
+        requests that are issued concurrently.
+        Args:
+            emails (List[str]): The emails of the users to find.
+        Returns:
+            Dict[str, List[dict]]: The matching user resources for each email, an empty list if none were found.
+        Raises:
+            requests.exceptions.RequestException: If the API request fails.
+        """
+        chunks = self._user_chunks(emails)
+        return self._merge_user_lookups(emails, self._batch(self._find_users_chunk, chunks))
+
+    def _upsert_found_user(self, email:str, displayName:str, attributes:dict, users:List[dict]):
+        """
+        Create or update a single user given the users already found for its email.
+        Args:
+            email (str): The email address of the user.
+            displayName (str): The display name for the user.
+            attributes (dict): Additional attributes for the user.
+            users (List[dict]): The existing users matching the email.
+        Prints:
+            Status messages about the operation's success or failure.
+        """
+        action, body = self._plan_upsert(email, displayName, attributes, users)
+        response = None
+        if action == 'update':
+            response = self.update_user(users[0]['id'], body)
+        elif action == 'create':
+            response = self.create_user(body)
+        self._report_upsert(action, email, users, response)
+
+    def upsert_users(self, users:List[dict]):
+        """
+        Create or update many users, looking them all up in batched requests first.
+        Emails are matched case insensitively; when one is given more than once only its last row is applied.
+        Args:
+            users (List[dict]): One dict per user with `email`, `displayName` and `attributes` keys,
+                matching the arguments of `upsert_user`.
+        Returns:
+            None
+        Prints:
+            Status messages about each operation's success or failure.
+        """
+        users = self._dedupe_user_rows(users)
+        found = self.find_users_by_emails([user['email'] for user in users])
+        if found is None:
+            return
+        for user in users:
+            self._upsert_found_user(user['email'], user['displayName'], user['attributes'], found[user['email']])
+
     def upsert_user(self, email:str, displayName:str, attributes:dict):
         """
         Create a new user or update an existing user's information.
@@ -464,30 +647,7 @@ class OmniAPI:
         Prints:
             Status messages about the operation's success or failure.
         """
-        body ={
-            "urn:omni:params:1.0:UserAttribute":self.listify(attributes)
-        }
-        response = self.find_user_by_email(email)
-        if response.status_code == 200:
-            users = response.json()['Resources']
-            if len(users) == 1:
-                user = users[0]
-                body.update({"userName":email, "displayName":displayName})
-                update_response = self.update_user(user['id'],body)
-                if update_response.status_code == 200:
-                    print(f"updated user id {user['id']}")
-                else:
-                    print(f"Error ({update_response.status_code}) updating user id {user['id']}")
-            elif len(users) == 0:
-                body.update({"userName":email, "displayName":displayName})
-                creation_response = self.create_user(body)
-                if creation_response.status_code == 201:
-                    print(f'Created {email}, userid: {creation_response.json()["id"]}')
-                else:
-                    print(f'Error creating {email}: {creation_response.status_code}')
-
-            elif len(users) > 1:
-                print(f'{len(users)} found for {email}, no action taken')
+        self.upsert_users([{'email': email, 'displayName': displayName, 'attributes': attributes}])
 
     def delete_user(self, email):
         """
@@ -499,15 +659,18 @@ class OmniAPI:
         Prints:
             Status messages about the operation's success or failure.
         """
-        users = self.find_user_by_email(email).json()['Resources']
+        _, found = self._find_user_parsed(email)
+        if found is None:
+            return
+        users = found['Resources']
         if len(users) == 1:
             user = users[0]
             response = self.delete_user_by_id(user['id'])
-            if response.status_code == 204:
+            if response is not None and response.status_code == 204:
                 print(f"deleted userid: {user['id']} email: {email}")
                 return response
         elif len(users) > 1:
-            print('found too many users for email {email}: ')
+            print(f'found too many users for email {email}: ')
             for u in users:
                 print(u['id'])
         elif len(users) == 0:
@@ -522,8 +685,8 @@ class OmniAPI:
         Returns:
             requests.Response: The response object from the delete operation.
         """
-        url = f"{self.base_url}/api/scim/v2/users"
-        response = requests.delete(f"{url}/{id}", headers=self.headers)
+        url = f"{self._scim_base}/{id}"
+        response = self.session.delete(url)
         response.raise_for_status()
         return response
 
@@ -536,10 +699,10 @@ class OmniAPI:
         Returns:
             dict: The exported document data as a dictionary.
         """
-        url = f"{self.base_url}/api/unstable/documents/{id}/export"
-        response = requests.get(url,headers=self.headers)
+        url = f"{self._docs_base}/documents/{id}/export"
+        response = self.session.get(url)
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def document_import(self, body:dict):
@@ -550,8 +713,8 @@ class OmniAPI:
         Returns:
             requests.Response: The response object from the import operation.
         """
-        url = f"{self.base_url}/api/unstable/documents/import"
-        response = requests.post(url,headers=self.headers, json=body)
+        url = f"{self._docs_base}/documents/import"
+        response = self._post_json(url, body)
         response.raise_for_status()
         return response
 
@@ -564,15 +727,14 @@ class OmniAPI:
         Returns:
             dict: A dictionary containing the list of folders.
         """
-        url = f"{self.base_url}/api/unstable/folders"
-        response = requests.get(url, 
-                                headers=self.headers, 
-                                params={
-                                    'path': path,
-                                    }
-                                )
+        url = f"{self._docs_base}/folders"
+        response = self.session.get(url, 
+                                    params={
+                                        'path': path,
+                                        }
+                                    )
         response.raise_for_status()
-        return response.json()
+        return self._json(response)
 
     @requests_error_handler
     def list_documents(self, folderId:str='') -> dict:
@@ -583,32 +745,14 @@ class OmniAPI:
         Returns:
             dict: A dictionary containing the list of documents.
         """
-        url = f"{self.base_url}/api/unstable/documents"
-        response = requests.get(url, 
-                                headers=self.headers, 
-                                params={
-                                    'folderId': folderId if folderId else None,
-                                    }
-                                )
+        url = f"{self._docs_base}/documents"
+        response = self.session.get(url, 
+                                    params={
+                                        'folderId': folderId if folderId else None,
+                                        }
+                                    )
         response.raise_for_status()
-        return response.json() 
-
-    @classmethod
-    def listify(cls, d:dict) -> dict:
-        """
-        Convert string representations of lists in a dictionary to actual lists.
-        Args:
-            d (dict): The input dictionary.
-        Returns:
-            dict: A new dictionary with string representations of lists converted to actual lists.
-        """
-        out = {}
-        for k,v in d.items():
-            if '[' in v and ']' in v:
-                out.update({k:[item for item in v.replace('[','').replace(']','').split(',')]})
-            else:
-                out.update({k:v})
-        return out
+        return self._json(response) 
 
     @requests_error_handler
     def generate_embed_url(self,body:dict) -> dict:
@@ -620,6 +764,6 @@ class OmniAPI:
             requests.Response: The response object containing the generated embed URL.
         """
         url = f"{self.base_url}/embed/sso/generate-url"
-        response = requests.post(url, headers=self.headers, json=body)
+        response = self._post_json(url, body)
         response.raise_for_status()
         return response
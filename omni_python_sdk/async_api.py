@@ -0,0 +1,702 @@
+import asyncio
+import httpx
+import pyarrow as pa
+import orjson
+from typing import List, Tuple, Any, Optional, Dict, Iterator
+import functools
+from ._mixin import OmniAPIMixin
+from ._lines import STREAM_CHUNK_SIZE, LineBuffer
+from ._retry import AsyncRetryTransport
+
+try:
+    import h2  # noqa: F401 -- required by httpx for http2=True
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+def async_requests_error_handler(func):
+    """
+    Coroutine counterpart of `requests_error_handler`. It catches all exceptions
+    raised while awaiting the decorated coroutine and prints an error message
+    with exception details.
+    Args:
+        func (callable): The coroutine function to be decorated.
+    Returns:
+        wrapper (callable): A coroutine function that handles exceptions.
+    Raises:
+        None (handled internally)
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except Exception as e:
+            print(f"Request Failed: {e}")
+            return None
+    return wrapper
+
+class AsyncOmniAPI(OmniAPIMixin):
+    """
+    asyncio version of `OmniAPI` built on `httpx.AsyncClient`. Methods mirror
+    the sync API as coroutines, so many queries or SCIM operations can run
+    concurrently on one event loop. Pass `http2=True` to multiplex them over
+    one HTTP/2 connection when h2 is installed.
+    Example Use:
+        async with AsyncOmniAPI(api_key, base_url) as api:
+            table, fields = await api.run_query_blocking(query)
+    """
+    def __init__(self, api_key: str = '', base_url: str = "https://dev.thundersalmon.com",env_file: str = '.env', http2: bool = False):
+        self._configure(api_key, base_url, env_file)
+        limits = httpx.Limits(max_connections=self.BATCH_WORKERS + 4, max_keepalive_connections=self.BATCH_WORKERS + 4)
+        transport = httpx.AsyncHTTPTransport(http2=http2 and H2_AVAILABLE, limits=limits)
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(60.0),
+            follow_redirects=True,
+            # the same status retries as OmniAPI, so a 429 inside a batch is retried, not dropped
+            transport=AsyncRetryTransport(transport),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the underlying client and its pooled connections.
+        """
+        await self._client.aclose()
+
+    @staticmethod
+    async def _aiter_lines(response: httpx.Response):
+        """
+        Iterate over a streamed body one line at a time as `bytes`; httpx only
+        offers decoded `str` lines.
+        Args:
+            response (httpx.Response): A streamed response.
+        Yields:
+            bytes: Each non blank line of the body, without its line ending.
+        """
+        buffer = LineBuffer()
+        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+            for line in buffer.feed(chunk):
+                yield line
+        for line in buffer.close():
+            yield line
+
+    async def _scan_query_response(self, response: httpx.Response) -> Tuple[List[dict], dict]:
+        """
+        Read a query NDJSON stream, picking out result payloads while parsing.
+        Args:
+            response (httpx.Response): A streamed response.
+        Returns:
+            Tuple[List[dict], dict]: The result payloads and the last (footer) record.
+        """
+        scan = self._query_scan()
+        async for line in self._aiter_lines(response):
+            scan.feed(line)
+        return scan.finish()
+
+    async def _wait_query(self, remaining_job_ids: List[str], timeout_ms: Optional[int] = None) -> Tuple[List[dict], dict]:
+        """
+        Poll the query wait endpoint once.
+        Args:
+            remaining_job_ids (List[str]): List of job IDs to wait for.
+            timeout_ms (int, optional): How long the server should hold the request open.
+        Returns:
+            Tuple[List[dict], dict]: The result payloads and the footer of the response.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = f"{self._docs_base}/query/wait"
+        # the endpoint expects job_ids as a JSON encoded list
+        params = {'job_ids': orjson.dumps(remaining_job_ids).decode()}
+        if timeout_ms is not None:
+            params['timeout_ms'] = timeout_ms
+        async with self._client.stream('GET', url, params=params) as response:
+            response.raise_for_status()
+            return await self._scan_query_response(response)
+
+    @async_requests_error_handler
+    async def wait_query_blocking(self, remaining_job_ids: List[str], timeout_ms: Optional[int] = None) -> Tuple[Any, bool]:
+        """
+        Wait for query jobs to complete.
+        Args:
+            remaining_job_ids (List[str]): List of job IDs to wait for.
+            timeout_ms (int, optional): How long the server should hold the request open
+                waiting for the jobs before answering with a timed out footer.
+        Returns:
+            Tuple[Any, bool]: A tuple containing the response JSON and a boolean indicating if the jobs are done.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        results, footer = await self._wait_query(remaining_job_ids, timeout_ms)
+        return self._wait_records(results, footer)
+
+    async def _run_query(self, body: dict) -> dict:
+        """
+        Run a query, polling until it completes.
+        Args:
+            body (dict): The query body.
+        Returns:
+            dict: The NDJSON record carrying the base64 Arrow result.
+        Raises:
+            ValueError: If no result is found in the response.
+            httpx.HTTPError: If the API request fails.
+        """
+        url = f"{self._docs_base}/query/run"
+        async with self._client.stream('POST', url, content=self._dumps(body)) as response:
+            response.raise_for_status()
+            scan = self._query_scan()
+            async for line in self._aiter_lines(response):
+                # a fast query can answer inline, no need to read on or poll
+                record = scan.feed(line)
+                if record is not None:
+                    return record
+        _, footer = scan.finish()
+        # same backoff as OmniAPI, but yielding to the event loop while waiting
+        backoff = self._poll_backoff(footer)
+        results = []
+        while not backoff.done(footer):
+            results, footer = await self._wait_query(footer['remaining_job_ids'], timeout_ms=self.POLL_TIMEOUT_MS)
+            delay = backoff.next_delay(footer)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        return self._first_result(results)
+
+    @async_requests_error_handler
+    async def run_query_blocking(self, body: dict) -> Tuple[pa.Table, List[dict]]:
+        """
+        Run a query and wait for its completion.
+        Args:
+            body (dict): The query body.
+        Returns:
+            Tuple[pa.Table, List[dict]]: A tuple containing the result table and field information.
+        Raises:
+            ValueError: If no result is found in the response.
+            httpx.HTTPError: If the API request fails.
+        """
+        return self._read_result(await self._run_query(body))
+
+    @async_requests_error_handler
+    async def run_query_stream(self, body: dict) -> Tuple[Iterator[pa.RecordBatch], List[dict]]:
+        """
+        Run a query and wait for its completion, returning the result as lazily
+        decoded record batches instead of one table, so callers that stop early
+        or hand batches on one at a time never materialize the whole result.
+        Args:
+            body (dict): The query body.
+        Returns:
+            Tuple[Iterator[pa.RecordBatch], List[dict]]: A tuple containing an iterator over the
+                result batches and field information.
+        Raises:
+            ValueError: If no result is found in the response.
+            httpx.HTTPError: If the API request fails.
+        """
+        data_payload = await self._run_query(body)
+        return iter(self._open_result(data_payload)), data_payload['summary']['fields']
+
+    @async_requests_error_handler
+    async def create_model(self, connection_id: str, body: dict) -> dict:
+        """
+        Create a new model.
+        Args:
+            connection_id (str): The connection ID.
+            body (dict): The model creation body.
+        Returns:
+            dict: The created model information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._base_model_url()
+        body["connectionId"] = connection_id
+        response = await self._client.post(url, content=self._dumps(body))
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def create_topic(self, model_id: str, base_view_name: str, body: dict) -> dict:
+        """
+        Create a new topic.
+        Args:
+            model_id (str): The ID of the model.
+            base_view_name (str): The name of the base view.
+            body (dict): The topic creation body.
+        Returns:
+            dict: The created topic information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._base_topic_url(model_id)
+        body["baseViewName"] = base_view_name
+        response = await self._client.post(url, content=self._dumps(body))
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def update_topic(self, model_id: str, topic_name: str, body: dict) -> dict:
+        """
+        Update an existing topic.
+        Args:
+            model_id (str): The ID of the model.
+            topic_name (str): The name of the topic to update.
+            body (dict): The topic update body.
+        Returns:
+            dict: The updated topic information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._topic_url(model_id, topic_name)
+        response = await self._client.patch(url, content=self._dumps(body))
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def delete_topic(self, model_id: str, topic_name: str) -> dict:
+        """
+        Delete a topic.
+        Args:
+            model_id (str): The ID of the model.
+            topic_name (str): The name of the topic to delete.
+        Returns:
+            dict: The response from the delete operation.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._topic_url(model_id, topic_name)
+        response = await self._client.delete(url)
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def create_view(self, model_id: str, view_name: str, body: dict) -> dict:
+        """
+        Create a new view.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view to create.
+            body (dict): The view creation body.
+        Returns:
+            dict: The created view information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._base_view_url(model_id)
+        body["viewName"] = view_name
+        response = await self._client.post(url, content=self._dumps(body))
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def update_view(self, model_id: str, view_name: str, body: dict) -> dict:
+        """
+        Update an existing view.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view to update.
+            body (dict): The view update body.
+        Returns:
+            dict: The updated view information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._view_url(model_id, view_name)
+        body["viewName"] = view_name
+        response = await self._client.patch(url, content=self._dumps(body))
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def delete_view(self, model_id: str, view_name: str) -> dict:
+        """
+        Delete a view.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view to delete.
+        Returns:
+            dict: The response from the delete operation.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._view_url(model_id, view_name)
+        response = await self._client.delete(url)
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def create_field(self, model_id: str, view_name: str, field_name: str, body: dict) -> dict:
+        """
+        Create a new field.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view.
+            field_name (str): The name of the field to create.
+            body (dict): The field creation body.
+        Returns:
+            dict: The created field information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._base_field_url(model_id)
+        body["fieldName"] = field_name
+        body["viewName"] = view_name
+        response = await self._client.post(url, content=self._dumps(body))
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def update_field(self, model_id: str, view_name: str, field_name: str, body: dict) -> dict:
+        """
+        Update an existing field.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view.
+            field_name (str): The name of the field to update.
+            body (dict): The field update body.
+        Returns:
+            dict: The updated field information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._field_url(model_id, view_name, field_name)
+        response = await self._client.patch(url, content=self._dumps(body))
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def delete_field(self, model_id: str, view_name: str, field_name: str) -> dict:
+        """
+        Delete a field.
+        Args:
+            model_id (str): The ID of the model.
+            view_name (str): The name of the view.
+            field_name (str): The name of the field to delete.
+        Returns:
+            dict: The response from the delete operation.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._field_url(model_id, view_name, field_name)
+        response = await self._client.delete(url)
+        response.raise_for_status()
+        return self._json(response)
+
+    @staticmethod
+    async def _gather(aws, limit: int) -> list:
+        """
+        Await many coroutines concurrently with at most `limit` in flight, the
+        async counterpart of the thread pool behind `OmniAPI._batch`.
+        Args:
+            aws (Iterable[Coroutine]): The coroutines to run.
+            limit (int): The most coroutines awaited at once.
+        Returns:
+            list: The results of each coroutine, in input order.
+        """
+        # created per call, a semaphore is bound to the running loop
+        semaphore = asyncio.Semaphore(limit)
+        async def bounded(aw):
+            async with semaphore:
+                return await aw
+        return await asyncio.gather(*(bounded(aw) for aw in aws))
+
+    async def create_fields(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Create many fields concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per field with `view`, `field` and `body` keys.
+        Returns:
+            List[dict]: The created field information for each spec, None where a call failed.
+        """
+        return await self._gather((self.create_field(model_id, spec['view'], spec['field'], spec['body']) for spec in specs), self.BATCH_WORKERS)
+
+    async def update_fields(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Update many fields concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per field with `view`, `field` and `body` keys.
+        Returns:
+            List[dict]: The updated field information for each spec, None where a call failed.
+        """
+        return await self._gather((self.update_field(model_id, spec['view'], spec['field'], spec['body']) for spec in specs), self.BATCH_WORKERS)
+
+    async def delete_fields(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Delete many fields concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per field with `view` and `field` keys.
+        Returns:
+            List[dict]: The response of each delete operation, None where a call failed.
+        """
+        return await self._gather((self.delete_field(model_id, spec['view'], spec['field']) for spec in specs), self.BATCH_WORKERS)
+
+    async def create_views(self, model_id: str, specs: List[dict]) -> List[dict]:
+        """
+        Create many views concurrently.
+        Args:
+            model_id (str): The ID of the model.
+            specs (List[dict]): One dict per view with `view` and `body` keys.
+        Returns:
+            List[dict]: The created view information for each spec, None where a call failed.
+        """
+        return await self._gather((self.create_view(model_id, spec['view'], spec['body']) for spec in specs), self.BATCH_WORKERS)
+
+    @async_requests_error_handler
+    async def create_user(self, body: dict) -> httpx.Response:
+        """
+        Create a new user.
+        Args:
+            body (dict): The user creation body.
+        Returns:
+            httpx.Response: The response from the create operation.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._scim_base
+        response = await self._client.post(url, content=self._dumps(body))
+        response.raise_for_status()
+        return response
+
+    @async_requests_error_handler
+    async def update_user(self, id: str, body: dict) -> httpx.Response:
+        """
+        Update an existing user.
+        Args:
+            id (str): The ID of the user to update.
+            body (dict): The user update body.
+        Returns:
+            httpx.Response: The response from the update operation.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = f"{self._scim_base}/{id}"
+        response = await self._client.put(url, content=self._dumps(body))
+        response.raise_for_status()
+        return response
+
+    @async_requests_error_handler
+    async def find_user_by_email(self, email: str) -> httpx.Response:
+        """
+        Find a user by email.
+        Args:
+            email (str): The email of the user to find.
+        Returns:
+            httpx.Response: The response containing the user information.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._scim_base
+        response = await self._client.get(url, params={'filter': f'userName eq "{email}"'})
+        response.raise_for_status()
+        return response
+
+    async def _find_users_chunk(self, emails: List[str]) -> List[dict]:
+        """
+        Look up a batch of users with a single SCIM filter, following further
+        pages when the server caps the page size below the batch size.
+        Args:
+            emails (List[str]): The emails of the users to find.
+        Returns:
+            List[dict]: The SCIM user resources matching any of the emails.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        url = self._scim_base
+        params = {'filter': self._user_filter(emails), 'count': len(emails), 'startIndex': 1}
+        resources = []
+        while True:
+            response = await self._client.get(url, params=params)
+            response.raise_for_status()
+            page = self._json(response)
+            resources.extend(page.get('Resources', []))
+            start = self._next_user_page(len(resources), page)
+            if start is None:
+                return resources
+            params['startIndex'] = start
+
+    @async_requests_error_handler
+    async def find_users_by_emails(self, emails: List[str]) -> Dict[str, List[dict]]:
+        """
+        Find many users by email, batching the lookups into chunked SCIM filter
+        requests that are issued concurrently.
+        Args:
+            emails (List[str]): The emails of the users to find.
+        Returns:
+            Dict[str, List[dict]]: The matching user resources for each email, an empty list if none were found.
+        Raises:
+            httpx.HTTPError: If the API request fails.
+        """
+        chunks = self._user_chunks(emails)
+        lookups = await self._gather((self._find_users_chunk(chunk) for chunk in chunks), self.BATCH_WORKERS)
+        return self._merge_user_lookups(emails, lookups)
+
+    async def _upsert_found_user(self, email:str, displayName:str, attributes:dict, users:List[dict]):
+        """
+        Create or update a single user given the users already found for its email.
+        Args:
+            email (str): The email address of the user.
+            displayName (str): The display name for the user.
+            attributes (dict): Additional attributes for the user.
+            users (List[dict]): The existing users matching the email.
+        Prints:
+            Status messages about the operation's success or failure.
+        """
+        action, body = self._plan_upsert(email, displayName, attributes, users)
+        response = None
+        if action == 'update':
+            response = await self.update_user(users[0]['id'], body)
+        elif action == 'create':
+            response = await self.create_user(body)
+        self._report_upsert(action, email, users, response)
+
+    async def upsert_users(self, users:List[dict]):
+        """
+        Create or update many users, looking them all up in batched requests first.
+        Emails are matched case insensitively; when one is given more than once only its last row is applied.
+        Args:
+            users (List[dict]): One dict per user with `email`, `displayName` and `attributes` keys,
+                matching the arguments of `upsert_user`.
+        Returns:
+            None
+        Prints:
+            Status messages about each operation's success or failure.
+        """
+        users = self._dedupe_user_rows(users)
+        found = await self.find_users_by_emails([user['email'] for user in users])
+        if found is None:
+            return
+        await self._gather((
+            self._upsert_found_user(user['email'], user['displayName'], user['attributes'], found[user['email']])
+            for user in users
+        ), self.BATCH_WORKERS)
+
+    async def upsert_user(self, email:str, displayName:str, attributes:dict):
+        """
+        Create a new user or update an existing user's information.
+        Args:
+            email (str): The email address of the user.
+            displayName (str): The display name for the user.
+            attributes (dict): Additional attributes for the user.
+        Returns:
+            None
+        Prints:
+            Status messages about the operation's success or failure.
+        """
+        await self.upsert_users([{'email': email, 'displayName': displayName, 'attributes': attributes}])
+
+    async def delete_user(self, email):
+        """
+        Delete a user by their email address.
+        Args:
+            email (str): The email address of the user to delete.
+        Returns:
+            httpx.Response: The response object if the user is successfully deleted.
+        Prints:
+            Status messages about the operation's success or failure.
+        """
+        response = await self.find_user_by_email(email)
+        if response is None:
+            return
+        users = self._json(response)['Resources']
+        if len(users) == 1:
+            user = users[0]
+            response = await self.delete_user_by_id(user['id'])
+            if response is not None and response.status_code == 204:
+                print(f"deleted userid: {user['id']} email: {email}")
+                return response
+        elif len(users) > 1:
+            print(f'found too many users for email {email}: ')
+            for u in users:
+                print(u['id'])
+        elif len(users) == 0:
+            print(f'user {email} not found')
+
+    @async_requests_error_handler
+    async def delete_user_by_id(self, id:str):
+        """
+        Delete a user by their user ID.
+        Args:
+            id (str): The ID of the user to delete.
+        Returns:
+            httpx.Response: The response object from the delete operation.
+        """
+        url = f"{self._scim_base}/{id}"
+        response = await self._client.delete(url)
+        response.raise_for_status()
+        return response
+
+    @async_requests_error_handler
+    async def document_export(self, id:str)->dict:
+        """
+        Export a document by its ID.
+        Args:
+            id (str): The ID of the document to export.
+        Returns:
+            dict: The exported document data as a dictionary.
+        """
+        url = f"{self._docs_base}/documents/{id}/export"
+        response = await self._client.get(url)
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def document_import(self, body:dict):
+        """
+        Import a document.
+        Args:
+            body (dict): The document data to import.
+        Returns:
+            httpx.Response: The response object from the import operation.
+        """
+        url = f"{self._docs_base}/documents/import"
+        response = await self._client.post(url, content=self._dumps(body))
+        response.raise_for_status()
+        return response
+
+    @async_requests_error_handler
+    async def list_folders(self, path:str='') -> dict:
+        """
+        List folders at the specified path.
+        Args:
+            path (str, optional): The path to list folders from. Defaults to an empty string.
+        Returns:
+            dict: A dictionary containing the list of folders.
+        """
+        url = f"{self._docs_base}/folders"
+        response = await self._client.get(url, params={'path': path})
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def list_documents(self, folderId:str='') -> dict:
+        """
+        List documents in the specified folder.
+        Args:
+            folderId (str, optional): The ID of the folder to list documents from. Defaults to an empty string.
+        Returns:
+            dict: A dictionary containing the list of documents.
+        """
+        url = f"{self._docs_base}/documents"
+        # httpx sends None as an empty value, so only pass folderId when set
+        response = await self._client.get(url, params={'folderId': folderId} if folderId else None)
+        response.raise_for_status()
+        return self._json(response)
+
+    @async_requests_error_handler
+    async def generate_embed_url(self,body:dict) -> httpx.Response:
+        """
+        Generate an embed URL.
+        Args:
+            body (dict): The request body containing necessary information for generating the embed URL.
+        Returns:
+            httpx.Response: The response object containing the generated embed URL.
+        """
+        url = f"{self.base_url}/embed/sso/generate-url"
+        response = await self._client.post(url, content=self._dumps(body))
+        response.raise_for_status()
+        return response
@@ -13,8 +13,13 @@ setup(
 	install_requires=[
 		'requests',
 		'pyarrow',
-		'ndjson'
+		'orjson'
 	],
+	extras_require={
+		'http2': ['httpx[http2]'],
+		'async': ['httpx[http2]'],
+		'compression': ['urllib3>=2', 'zstandard', 'brotli'],
+	},
 	classifiers=[
 		'Programming Language :: Python :: 3',
 		'License :: OSI Approved :: MIT License',
@@ -0,0 +1,35 @@
+import pytest
+from omni_python_sdk import OmniAPI
+
+class FakeResponse:
+    """
+    Minimal stand-in for a streamed `requests.Response`, yielding its body in
+    fixed size chunks regardless of the chunk size asked for.
+    """
+    def __init__(self, body: bytes, chunk_size: int = 512, status_code: int = 200):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size=None):
+        for i in range(0, len(self.body), self.chunk_size):
+            yield self.body[i:i + self.chunk_size]
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    env_file = tmp_path / '.env'
+    env_file.write_text('OMNI_API_KEY=test-key\nOMNI_BASE_URL=https://example.omniapp.co\n')
+    # load_dotenv writes into os.environ, let monkeypatch undo that afterwards
+    monkeypatch.setenv('OMNI_API_KEY', 'test-key')
+    monkeypatch.setenv('OMNI_BASE_URL', 'https://example.omniapp.co')
+    with OmniAPI(env_file=str(env_file), http2=False) as api:
+        yield api
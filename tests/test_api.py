@@ -0,0 +1,108 @@
+from omni_python_sdk import OmniAPI
+
+def test_batch_reuses_one_executor(api):
+    executor = api._executor
+    assert api._batch(lambda x: x * 2, [1, 2, 3]) == [2, 4, 6]
+    assert api._batch(str, [1]) == ['1']
+    assert api._executor is executor
+
+def test_close_shuts_down_executor_and_session(tmp_path, monkeypatch):
+    env_file = tmp_path / '.env'
+    env_file.write_text('OMNI_API_KEY=test-key\nOMNI_BASE_URL=https://example.omniapp.co\n')
+    monkeypatch.setenv('OMNI_API_KEY', 'test-key')
+    monkeypatch.setenv('OMNI_BASE_URL', 'https://example.omniapp.co')
+    closed = []
+    with OmniAPI(env_file=str(env_file), http2=False) as api:
+        monkeypatch.setattr(api.session, 'close', lambda: closed.append(True))
+    assert closed == [True]
+    assert api._executor._shutdown
+
+class _Server:
+    """
+    A local keep-alive HTTP server answering every request with `status`,
+    counting requests and the connections they arrived on.
+    """
+    def __init__(self, status=200):
+        import http.server
+        import threading
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def _answer(self):
+                server.requests.append(self.command)
+                self.send_response(server.status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            do_HEAD = do_GET = _answer
+
+            def log_message(self, *args):
+                pass
+
+        self.status = status
+        self.requests = []
+        self.connections = 0
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self._httpd.server_port}'
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+def _warm_api(tmp_path, monkeypatch, base_url, **kwargs):
+    env_file = tmp_path / '.env'
+    env_file.write_text(f'OMNI_API_KEY=test-key\nOMNI_BASE_URL={base_url}\n')
+    monkeypatch.setenv('OMNI_API_KEY', 'test-key')
+    monkeypatch.setenv('OMNI_BASE_URL', base_url)
+    return OmniAPI(env_file=str(env_file), http2=False, warm_up=True, **kwargs)
+
+def test_warm_up_connection_is_reused(tmp_path, monkeypatch):
+    server = _Server()
+    try:
+        with _warm_api(tmp_path, monkeypatch, server.url) as api:
+            assert server.requests == ['HEAD']
+            api.session.get(server.url).close()
+        assert server.requests == ['HEAD', 'GET']
+        assert server.connections == 1
+    finally:
+        server.close()
+
+def test_warm_up_is_a_single_attempt(tmp_path, monkeypatch):
+    import pytest
+    import requests
+    from urllib3.util.retry import Retry
+    monkeypatch.setattr(Retry, 'sleep', lambda self, response=None: None)
+    server = _Server(status=503)
+    try:
+        with _warm_api(tmp_path, monkeypatch, server.url) as api:
+            assert server.requests == ['HEAD']
+            # real calls keep the session's retries
+            with pytest.raises(requests.exceptions.RetryError):
+                api.session.get(server.url)
+        assert server.requests == ['HEAD'] + ['GET'] * 4
+    finally:
+        server.close()
+
+def test_httpx_probe_is_a_single_attempt():
+    import pytest
+    httpx = pytest.importorskip('httpx')
+    from omni_python_sdk._http2 import HTTPXSession
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        raise httpx.ConnectError('unreachable', request=request)
+
+    session = HTTPXSession({})
+    session._transport = httpx.MockTransport(handler)
+    with pytest.raises(httpx.ConnectError):
+        session.probe('https://example.omniapp.co', timeout=5)
+    assert calls == ['HEAD']
+    session.close()
@@ -0,0 +1,106 @@
+import pytest
+
+httpx = pytest.importorskip('httpx')
+from omni_python_sdk import _retry
+from omni_python_sdk._http2 import HTTPXSession
+from omni_python_sdk._retry import retry_delay
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(_retry.time, 'sleep', lambda seconds: None)
+    session = HTTPXSession({'Authorization': 'Bearer test-key'})
+    yield session
+    session.close()
+
+def serve(session, handler):
+    # keep the configured client and retry wrapper, only swap the network for a canned one
+    session._client._transport._transport = httpx.MockTransport(handler)
+
+def test_retries_retryable_statuses_on_idempotent_methods(session):
+    statuses = iter([503, 429, 200])
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(next(statuses), json={'ok': True})
+
+    serve(session, handler)
+    response = session.get('https://example.omniapp.co/api/unstable/documents')
+    assert response.status_code == 200
+    assert calls == ['GET', 'GET', 'GET']
+
+def test_gives_up_after_three_retries(session):
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(502)
+
+    serve(session, handler)
+    assert session.put('https://example.omniapp.co/api/scim/v2/users/1', data=b'{}').status_code == 502
+    assert len(calls) == 4
+
+def test_does_not_retry_post(session):
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        return httpx.Response(503)
+
+    serve(session, handler)
+    assert session.post('https://example.omniapp.co/api/scim/v2/users', data=b'{}').status_code == 503
+    assert calls == ['POST']
+
+def test_retries_connection_failures_on_any_method(session):
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) < 3:
+            raise httpx.ConnectError('refused', request=request)
+        return httpx.Response(201)
+
+    serve(session, handler)
+    assert session.post('https://example.omniapp.co/api/scim/v2/users', data=b'{}').status_code == 201
+    assert calls == ['POST'] * 3
+
+def test_follows_redirects(session):
+    def handler(request):
+        if request.url.path == '/old':
+            return httpx.Response(302, headers={'Location': 'https://example.omniapp.co/new'})
+        return httpx.Response(200, json={'path': request.url.path})
+
+    serve(session, handler)
+    assert session.get('https://example.omniapp.co/old').json() == {'path': '/new'}
+
+def test_retry_delay_honours_retry_after():
+    assert retry_delay(0, httpx.Response(429, headers={'Retry-After': '3'})) == 3.0
+    assert retry_delay(0, httpx.Response(503)) == 0.0
+    assert retry_delay(2, httpx.Response(503)) == pytest.approx(0.8)
+
+def test_async_client_retries_retryable_statuses(api, tmp_path, monkeypatch):
+    import asyncio
+    from omni_python_sdk.async_api import AsyncOmniAPI
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(_retry.asyncio, 'sleep', sleep)
+    statuses = {'/api/unstable/model/m/view/a/field/x': iter([429, 200]), '/api/unstable/model/m/view/b/field/y': iter([200])}
+
+    def handler(request):
+        status = next(statuses[request.url.path])
+        return httpx.Response(status, headers={'Retry-After': '1'} if status == 429 else {}, json={'path': request.url.path})
+
+    async def delete():
+        async with AsyncOmniAPI(env_file=str(tmp_path / '.env')) as async_api:
+            # keep the configured client and retry wrapper, only swap the network
+            async_api._client._transport._transport = httpx.MockTransport(handler)
+            return await async_api.delete_fields('m', [{'view': 'a', 'field': 'x'}, {'view': 'b', 'field': 'y'}])
+
+    assert asyncio.run(delete()) == [
+        {'path': '/api/unstable/model/m/view/a/field/x'},
+        {'path': '/api/unstable/model/m/view/b/field/y'},
+    ]
+    assert sleeps == [1.0]
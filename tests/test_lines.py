@@ -0,0 +1,127 @@
+import base64
+import pytest
+import tracemalloc
+import orjson
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from omni_python_sdk._lines import LineBuffer, iter_lines
+from conftest import FakeResponse
+
+class CountingBuffer(bytearray):
+    """
+    A `LineBuffer` buffer that counts the bytes its newline searches cover,
+    so linear splitting can be asserted without timing anything.
+    """
+    scanned = 0
+
+    def find(self, sub, start=0, *args):
+        index = super().find(sub, start, *args)
+        CountingBuffer.scanned += (index + 1 if index != -1 else len(self)) - start
+        return index
+
+@pytest.fixture
+def scanned(monkeypatch):
+    """
+    Route every LineBuffer through a CountingBuffer; returns a callable
+    reporting the bytes scanned so far.
+    """
+    def init(self):
+        self._buffer = CountingBuffer()
+    monkeypatch.setattr(LineBuffer, '__init__', init)
+    CountingBuffer.scanned = 0
+    return lambda: CountingBuffer.scanned
+
+def _arrow_payload(rows: int) -> str:
+    table = pa.table({'id': pa.array(range(rows), type=pa.int64())})
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode()
+
+def test_lines_split_across_chunks():
+    chunks = [b'{"a":1}\n{"b"', b':2}\r\n', b'\n', b'  \n{"c":3}']
+    assert list(iter_lines(chunks)) == [b'{"a":1}', b'{"b":2}', b'{"c":3}']
+
+def test_line_buffer_keeps_partial_line_until_newline():
+    buffer = LineBuffer()
+    assert buffer.feed(b'{"a"') == []
+    assert buffer.feed(b':1}\n{"b"') == [b'{"a":1}']
+    assert buffer.close() == [b'{"b"']
+    assert buffer.close() == []
+
+def test_multi_megabyte_line_is_linear(scanned):
+    line = b'x' * (8 * 1024 * 1024)
+    chunks = (line[i:i + 512] for i in range(0, len(line), 512))
+    lines = list(iter_lines(chunks))
+    assert lines == [line]
+    # each byte is searched once; re-splitting everything pending per chunk
+    # would scan about len(line) ** 2 / 1024 bytes here
+    assert scanned() <= len(line)
+
+def test_multi_megabyte_line_is_copied_once():
+    size = 8 * 1024 * 1024
+    line = b'x' * size
+    chunks = [line[i:i + 64 * 1024] for i in range(0, size, 64 * 1024)] + [b'\n']
+    tracemalloc.start()
+    try:
+        lines = list(iter_lines(chunks))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert lines == [line]
+    # the pending buffer plus one copy of the line; slicing the bytearray and
+    # then calling bytes() on it peaked at three
+    assert peak < 2.5 * size
+
+def test_scan_query_response_reads_large_result(api, scanned):
+    payload = _arrow_payload(1_000_000)
+    assert len(payload) > 4 * 1024 * 1024
+    body = b'\n'.join([
+        orjson.dumps({'job_id': 'a', 'status': 'COMPLETE'}),
+        orjson.dumps({'job_id': 'a', 'result': payload, 'summary': {'fields': {'id': {}}}}),
+        orjson.dumps({'timed_out': 'false', 'remaining_job_ids': []}),
+    ]) + b'\n'
+    results, footer = api._scan_query_response(FakeResponse(body))
+    assert scanned() <= len(body)
+    assert footer == {'timed_out': 'false', 'remaining_job_ids': []}
+    assert len(results) == 1
+    table, fields = api._read_result(results[0])
+    assert table.num_rows == 1_000_000
+    assert table.column('id')[-1].as_py() == 999_999
+    assert fields == {'id': {}}
+
+def test_httpx_response_iter_lines(scanned):
+    from omni_python_sdk._http2 import HTTPXResponse
+
+    class Body:
+        def iter_bytes(self, chunk_size=None):
+            line = b'y' * (4 * 1024 * 1024)
+            yield b'{"a":1}\n'
+            for i in range(0, len(line), 16 * 1024):
+                yield line[i:i + 16 * 1024]
+            yield b'\n{"timed_out":"false"}'
+
+    lines = list(HTTPXResponse(Body()).iter_lines())
+    assert scanned() <= sum(len(line) + 1 for line in lines)
+    assert lines[0] == b'{"a":1}'
+    assert len(lines[1]) == 4 * 1024 * 1024
+    assert lines[2] == b'{"timed_out":"false"}'
+
+def test_async_iter_lines(scanned):
+    import asyncio
+    from omni_python_sdk.async_api import AsyncOmniAPI
+
+    class Body:
+        async def aiter_bytes(self, chunk_size=None):
+            line = b'z' * (4 * 1024 * 1024)
+            yield b'{"a":1}\n'
+            for i in range(0, len(line), 512):
+                yield line[i:i + 512]
+            yield b'\n{"timed_out":"false"}'
+
+    async def collect():
+        return [line async for line in AsyncOmniAPI._aiter_lines(Body())]
+
+    lines = asyncio.run(collect())
+    assert scanned() <= sum(len(line) + 1 for line in lines)
+    assert [len(line) for line in lines] == [7, 4 * 1024 * 1024, 21]
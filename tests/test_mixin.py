@@ -0,0 +1,74 @@
+import asyncio
+from omni_python_sdk._mixin import _PollBackoff, _QueryScan, OmniAPIMixin
+from omni_python_sdk.async_api import AsyncOmniAPI
+
+def test_query_scan_keeps_results_and_footer():
+    scan = _QueryScan(OmniAPIMixin._parse_record)
+    assert scan.feed(b'{"job_id":"a"}') is None
+    record = scan.feed(b'{"result":"QUJD","summary":{"fields":[]}}')
+    assert bytes(record['result']) == b'QUJD'
+    assert scan.feed(b'{"timed_out":"false","remaining_job_ids":[]}') is None
+    results, footer = scan.finish()
+    assert results == [record]
+    assert footer == {'timed_out': 'false', 'remaining_job_ids': []}
+
+def test_query_scan_result_as_last_line_is_the_footer():
+    scan = _QueryScan(OmniAPIMixin._parse_record)
+    scan.feed(b'{"job_id":"a"}')
+    record = scan.feed(b'{"result":"QUJD","timed_out":"false"}')
+    results, footer = scan.finish()
+    assert footer is record and results == [record]
+
+def test_poll_backoff_doubles_caps_and_resets():
+    def footer(*jobs):
+        return {'timed_out': 'true', 'remaining_job_ids': list(jobs)}
+    backoff = _PollBackoff(footer('a', 'b'), initial=0.1, maximum=0.3)
+    assert backoff.next_delay(footer('a', 'b')) == 0.1
+    assert backoff.next_delay(footer('a', 'b')) == 0.2
+    assert backoff.next_delay(footer('a', 'b')) == 0.3
+    # another job finished, start over from the initial delay
+    assert backoff.next_delay(footer('a')) == 0.1
+    assert backoff.next_delay({'timed_out': 'false', 'remaining_job_ids': []}) is None
+
+def test_merge_user_lookups_is_case_insensitive():
+    lookups = [[{'id': '1', 'userName': 'Ann@Example.com'}], [{'id': '2', 'userName': 'bob@example.com'}]]
+    found = OmniAPIMixin._merge_user_lookups(['ann@example.com', 'bob@example.com', 'cy@example.com'], lookups)
+    assert [u['id'] for u in found['ann@example.com']] == ['1']
+    assert [u['id'] for u in found['bob@example.com']] == ['2']
+    assert found['cy@example.com'] == []
+
+def test_plan_upsert(api):
+    assert api._plan_upsert('a@example.com', 'A', {'region': '[n,s]'}, []) == ('create', {
+        'urn:omni:params:1.0:UserAttribute': {'region': ['n', 's']},
+        'userName': 'a@example.com',
+        'displayName': 'A',
+    })
+    assert api._plan_upsert('a@example.com', 'A', {}, [{'id': '1'}])[0] == 'update'
+    assert api._plan_upsert('a@example.com', 'A', {}, [{'id': '1'}, {'id': '2'}])[0] == 'skip'
+
+def test_async_gather_is_bounded():
+    in_flight = 0
+    peak = 0
+
+    async def call(i):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return i
+
+    results = asyncio.run(AsyncOmniAPI._gather((call(i) for i in range(50)), 4))
+    assert results == list(range(50))
+    assert peak == 4
+
+def test_listify():
+    assert OmniAPIMixin.listify({'a': '[north, south]', 'b': '[]', 'c': '[', 'd': ']', 'e': 'x', 'f': 3}) == {
+        'a': ['north', 'south'],
+        'b': [],
+        # a lone bracket neither starts and ends a list, it passes through
+        'c': '[',
+        'd': ']',
+        'e': 'x',
+        'f': 3,
+    }
@@ -0,0 +1,60 @@
+import base64
+import orjson
+import pytest
+from omni_python_sdk._mixin import OmniAPIMixin
+from conftest import FakeResponse
+
+parse = OmniAPIMixin._parse_record
+
+def test_plain_record():
+    assert parse(b'{"timed_out":"false","remaining_job_ids":[]}') == {'timed_out': 'false', 'remaining_job_ids': []}
+
+def test_plain_result_is_a_view_over_the_line():
+    record = parse(b'{"job_id":"a","result":"QUJD","summary":{"fields":{}}}')
+    assert isinstance(record['result'], memoryview)
+    assert bytes(record['result']) == b'QUJD'
+    assert record['job_id'] == 'a'
+    assert record['summary'] == {'fields': {}}
+
+def test_result_with_whitespace_around_colon():
+    record = parse(b'{"result" :  "QUJD", "summary": {}}')
+    assert bytes(record['result']) == b'QUJD'
+
+def test_nested_result_key():
+    line = b'{"summary":{"result":"nested"},"job_id":"a"}'
+    assert parse(line) == orjson.loads(line)
+
+def test_nested_result_key_before_top_level_result():
+    record = parse(b'{"summary":{"result":"nested"},"result":"QUJD"}')
+    assert record['summary'] == {'result': 'nested'}
+    assert OmniAPIMixin._result_text(record['result']) == 'QUJD'
+
+def test_nested_result_with_escaped_quotes():
+    line = b'{"summary":{"result":"say \\"hi\\""},"result":"QUJD"}'
+    assert parse(line) == {'summary': {'result': 'say "hi"'}, 'result': 'QUJD'}
+
+def test_null_result():
+    assert parse(b'{"result": null, "summary": {}}') == {'result': None, 'summary': {}}
+
+def test_escaped_slash_in_payload():
+    raw = bytes(range(256))
+    encoded = base64.b64encode(raw)
+    assert b'/' in encoded
+    record = parse(b'{"result":"' + encoded.replace(b'/', b'\\/') + b'"}')
+    assert base64.b64decode(record['result']) == raw
+    assert OmniAPIMixin._result_text(record['result']) == encoded.decode()
+
+def test_result_key_inside_string_value():
+    line = b'{"message":"the \\"result\\": \\"x\\" key","a":1}'
+    assert parse(line) == orjson.loads(line)
+
+def test_invalid_json_still_raises():
+    with pytest.raises(orjson.JSONDecodeError):
+        parse(b'{"result":"QUJD"')
+
+def test_wait_query_blocking_returns_unescaped_result(api, monkeypatch):
+    body = b'{"result":"QU\\/D","summary":{}}\n{"timed_out":"false"}\n'
+    monkeypatch.setattr(api.session, 'get', lambda *args, **kwargs: FakeResponse(body))
+    records, done = api.wait_query_blocking(['a'])
+    assert done
+    assert records == [{'result': 'QU/D', 'summary': {}}, {'timed_out': 'false'}]
@@ -0,0 +1,143 @@
+import asyncio
+import base64
+import orjson
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pytest
+from omni_python_sdk import api as api_module
+from conftest import FakeResponse
+
+QUERY = {'query': {'table': 'order_items', 'modelId': 'm'}}
+FIELDS = {'id': {}}
+
+def _arrow_payload(batches: int, rows: int) -> str:
+    schema = pa.schema([('id', pa.int64())])
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, schema) as writer:
+        for b in range(batches):
+            writer.write_batch(pa.record_batch([pa.array(range(b * rows, (b + 1) * rows), type=pa.int64())], schema=schema))
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode()
+
+def _ndjson(*records) -> bytes:
+    return b'\n'.join(orjson.dumps(record) for record in records) + b'\n'
+
+def _result(payload: str) -> dict:
+    return {'job_id': 'a', 'result': payload, 'summary': {'fields': FIELDS}}
+
+def _pending(*jobs) -> dict:
+    return {'timed_out': 'true', 'remaining_job_ids': list(jobs)}
+
+DONE = {'timed_out': 'false', 'remaining_job_ids': []}
+
+class FakeSession:
+    """
+    Answers /query/run and /query/wait with canned NDJSON bodies, in order,
+    recording what was sent.
+    """
+    def __init__(self, run: bytes, waits=()):
+        self.run = run
+        self.waits = list(waits)
+        self.posts = []
+        self.gets = []
+
+    def post(self, url, data=None, stream=False, **kwargs):
+        self.posts.append((url, orjson.loads(data), stream))
+        return FakeResponse(self.run)
+
+    def get(self, url, params=None, stream=False, **kwargs):
+        self.gets.append((url, params, stream))
+        return FakeResponse(self.waits.pop(0))
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(api_module.time, 'sleep', sleeps.append)
+    return sleeps
+
+def test_run_query_inline_result(api, sleeps):
+    payload = _arrow_payload(1, 3)
+    api.session = FakeSession(_ndjson({'job_id': 'a', 'status': 'RUNNING'}, _result(payload), DONE))
+    table, fields = api.run_query_blocking(QUERY)
+    assert table.column('id').to_pylist() == [0, 1, 2]
+    assert fields == FIELDS
+    [(url, body, stream)] = api.session.posts
+    assert url == 'https://example.omniapp.co/api/unstable/query/run'
+    assert body == QUERY and stream
+    assert api.session.gets == [] and sleeps == []
+
+def test_run_query_polls_until_done(api, sleeps):
+    payload = _arrow_payload(1, 2)
+    api.session = FakeSession(
+        _ndjson({'job_id': 'a', 'status': 'RUNNING'}, _pending('a', 'b')),
+        waits=[
+            _ndjson(_pending('a', 'b')),
+            _ndjson(_pending('a', 'b')),
+            _ndjson(_pending('a')),
+            _ndjson(_result(payload), DONE),
+        ],
+    )
+    table, _ = api.run_query_blocking(QUERY)
+    assert table.column('id').to_pylist() == [0, 1]
+    assert [params for _, params, _ in api.session.gets] == [
+        {'job_ids': '["a","b"]', 'timeout_ms': api.POLL_TIMEOUT_MS},
+        {'job_ids': '["a","b"]', 'timeout_ms': api.POLL_TIMEOUT_MS},
+        {'job_ids': '["a","b"]', 'timeout_ms': api.POLL_TIMEOUT_MS},
+        {'job_ids': '["a"]', 'timeout_ms': api.POLL_TIMEOUT_MS},
+    ]
+    assert all(url.endswith('/api/unstable/query/wait') and stream for url, _, stream in api.session.gets)
+    # doubles while nothing finishes, starts over when job b does, none once done
+    assert sleeps == [0.1, 0.2, 0.1]
+
+def test_run_query_without_result_fails(api, sleeps, capsys):
+    api.session = FakeSession(_ndjson(_pending('a')), waits=[_ndjson(DONE)])
+    assert api.run_query_blocking(QUERY) is None
+    assert 'No result found in the response.' in capsys.readouterr().out
+
+def test_run_query_stream_yields_batches_in_order(api, sleeps):
+    api.session = FakeSession(_ndjson(_result(_arrow_payload(4, 5)), DONE))
+    batches, fields = api.run_query_stream(QUERY)
+    assert fields == FIELDS
+    batches = list(batches)
+    assert [batch.num_rows for batch in batches] == [5, 5, 5, 5]
+    assert [v for batch in batches for v in batch.column(0).to_pylist()] == list(range(20))
+
+def test_async_run_query_polls_until_done(api, tmp_path, monkeypatch):
+    httpx = pytest.importorskip('httpx')
+    from omni_python_sdk.async_api import AsyncOmniAPI
+    payload = _arrow_payload(3, 2)
+    bodies = {
+        '/api/unstable/query/run': [_ndjson(_pending('a'))],
+        '/api/unstable/query/wait': [_ndjson(_pending('a')), _ndjson(_result(payload), DONE)],
+    }
+    requests = []
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+
+    def handler(request):
+        requests.append((request.method, request.url.path, dict(request.url.params)))
+        return httpx.Response(200, content=bodies[request.url.path].pop(0))
+
+    async def run():
+        async with AsyncOmniAPI(env_file=str(tmp_path / '.env')) as async_api:
+            async_api._client._transport._transport = httpx.MockTransport(handler)
+            batches, fields = await async_api.run_query_stream(QUERY)
+            return list(batches), fields
+
+    batches, fields = asyncio.run(run())
+    assert fields == FIELDS
+    assert [v for batch in batches for v in batch.column(0).to_pylist()] == list(range(6))
+    assert requests == [
+        ('POST', '/api/unstable/query/run', {}),
+        ('GET', '/api/unstable/query/wait', {'job_ids': '["a"]', 'timeout_ms': '30000'}),
+        ('GET', '/api/unstable/query/wait', {'job_ids': '["a"]', 'timeout_ms': '30000'}),
+    ]
+    assert sleeps == [0.1]
@@ -0,0 +1,96 @@
+import re
+import orjson
+
+class ScimResponse:
+    def __init__(self, body: dict, status_code: int = 200):
+        self.content = orjson.dumps(body)
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+class FakeScim:
+    """
+    Serves SCIM filter lookups from a list of users, returning at most
+    `page_size` resources per page whatever `count` is asked for.
+    """
+    def __init__(self, users, page_size=2):
+        self.users = users
+        self.page_size = page_size
+        self.requests = []
+
+    def get(self, url, params=None, **kwargs):
+        self.requests.append(dict(params))
+        wanted = {e.lower() for e in re.findall(r'userName eq "([^"]+)"', params['filter'])}
+        matches = [u for u in self.users if u['userName'].lower() in wanted]
+        start = params.get('startIndex', 1) - 1
+        page = matches[start:start + min(params['count'], self.page_size)]
+        return ScimResponse({'totalResults': len(matches), 'startIndex': start + 1, 'itemsPerPage': len(page), 'Resources': page})
+
+    def close(self):
+        pass
+
+def test_find_users_by_emails_follows_pages(api):
+    users = [{'id': str(i), 'userName': f'user{i}@example.com'} for i in range(5)]
+    api.session = FakeScim(users, page_size=2)
+    found = api.find_users_by_emails([u['userName'] for u in users] + ['missing@example.com'])
+    assert {email: [u['id'] for u in matched] for email, matched in found.items()} == {
+        'user0@example.com': ['0'],
+        'user1@example.com': ['1'],
+        'user2@example.com': ['2'],
+        'user3@example.com': ['3'],
+        'user4@example.com': ['4'],
+        'missing@example.com': [],
+    }
+    assert [r['startIndex'] for r in api.session.requests] == [1, 3, 5]
+
+def test_find_users_by_emails_single_page(api):
+    api.session = FakeScim([{'id': '1', 'userName': 'a@example.com'}], page_size=50)
+    found = api.find_users_by_emails(['a@example.com', 'b@example.com'])
+    assert [u['id'] for u in found['a@example.com']] == ['1']
+    assert len(api.session.requests) == 1
+
+def test_async_find_users_by_emails_follows_pages(api, tmp_path):
+    import asyncio
+    import httpx
+    from omni_python_sdk.async_api import AsyncOmniAPI
+    scim = FakeScim([{'id': str(i), 'userName': f'user{i}@example.com'} for i in range(3)], page_size=1)
+
+    def handler(request):
+        params = dict(request.url.params)
+        params['count'] = int(params['count'])
+        params['startIndex'] = int(params['startIndex'])
+        return httpx.Response(200, content=scim.get(str(request.url), params=params).content)
+
+    async def lookup():
+        async with AsyncOmniAPI(env_file=str(tmp_path / '.env'), http2=False) as async_api:
+            await async_api._client.aclose()
+            async_api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await async_api.find_users_by_emails([f'user{i}@example.com' for i in range(3)])
+
+    found = asyncio.run(lookup())
+    assert [u['id'] for matched in found.values() for u in matched] == ['0', '1', '2']
+    assert [r['startIndex'] for r in scim.requests] == [1, 2, 3]
+
+def test_find_users_by_emails_looks_up_case_variants_once(api):
+    api.session = FakeScim([{'id': '1', 'userName': 'ann@example.com'}])
+    found = api.find_users_by_emails(['Ann@Example.com', 'ann@example.com', 'ann@example.com'])
+    assert {email: [u['id'] for u in matched] for email, matched in found.items()} == {
+        'Ann@Example.com': ['1'],
+        'ann@example.com': ['1'],
+    }
+    assert api.session.requests[0]['filter'].count('userName eq') == 1
+
+def test_upsert_users_applies_one_row_per_user(api, monkeypatch, capsys):
+    api.session = FakeScim([{'id': '1', 'userName': 'ann@example.com'}])
+    created, updated = [], []
+    monkeypatch.setattr(api, 'create_user', lambda body: created.append(body) or ScimResponse({'id': 'new'}, 201))
+    monkeypatch.setattr(api, 'update_user', lambda id, body: updated.append((id, body)) or ScimResponse({}, 200))
+    api.upsert_users([
+        {'email': 'bob@example.com', 'displayName': 'Bob', 'attributes': {}},
+        {'email': 'ann@example.com', 'displayName': 'Ann', 'attributes': {}},
+        {'email': 'BOB@example.com', 'displayName': 'Robert', 'attributes': {}},
+    ])
+    assert [(body['userName'], body['displayName']) for body in created] == [('BOB@example.com', 'Robert')]
+    assert [(id, body['displayName']) for id, body in updated] == [('1', 'Ann')]
+    assert 'BOB@example.com given more than once' in capsys.readouterr().out